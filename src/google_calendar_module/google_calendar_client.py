@@ -2,6 +2,7 @@ import datetime
 import os.path
 import logging
 
+from typing import Tuple
 from notion_x_google_calendar.models import Event
 
 from google.auth.transport.requests import Request
@@ -15,9 +16,32 @@ SCOPES = ["https://www.googleapis.com/auth/calendar"]
 
 
 class GoogleCalendarClient:
-    def __init__(self, calendar_id="primary") -> None:
+    def __init__(
+        self,
+        calendar_id="primary",
+        token_path="token.json",
+        credentials_path="credentials.json",
+        interactive=True,
+    ) -> None:
+        """Authenticate to the Google Calendar API.
+
+        Args:
+            calendar_id (str, optional): Calendar to synchronize. Defaults to "primary".
+            token_path (str, optional): Access and refresh tokens of the user.
+            credentials_path (str, optional): OAuth client of the application.
+            interactive (bool, optional): Let the user log in from a browser when the
+                token is missing or can't be refreshed, otherwise raise an exception.
+                Defaults to True.
+        """
+
         def run_flow():
-            flow = InstalledAppFlow.from_client_secrets_file("credentials.json", SCOPES)
+            if not interactive:
+                raise RuntimeError(
+                    f"The Google Calendar token {token_path} is missing or can't be "
+                    "refreshed, authorize again by running notion-x-google-calendar "
+                    "from its directory."
+                )
+            flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
             creds = flow.run_local_server(port=0)
             return creds
 
@@ -27,8 +51,8 @@ class GoogleCalendarClient:
         # The file token.json stores the user's access and refresh tokens, and is
         # created automatically when the authorization flow completes for the first
         # time.
-        if os.path.exists("token.json"):
-            creds = Credentials.from_authorized_user_file("token.json", SCOPES)
+        if os.path.exists(token_path):
+            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
 
         # If there are no (valid) credentials available, let the user log in.
         if not creds or not creds.valid:
@@ -37,13 +61,16 @@ class GoogleCalendarClient:
                     creds.refresh(Request())
                 except:
                     logging.error("Google Calendar API token is invalid.")
-                    logging.info("Deleting token.json file, and trying again...")
-                    os.remove("token.json")
+                    # Without a user to log in again, keep the token, the refresh
+                    # may only have failed temporarily
+                    if interactive:
+                        logging.info("Deleting token.json file, and trying again...")
+                        os.remove(token_path)
                     creds = run_flow()
             else:
                 creds = run_flow()
             # Save the credentials for the next run
-            with open("token.json", "w") as token:
+            with open(token_path, "w") as token:
                 token.write(creds.to_json())
 
         ## Google Calendar Service ##
@@ -84,6 +111,54 @@ class GoogleCalendarClient:
             )
             return None
 
+    def retrieve_changes(
+        self, sync_token=None, max_results=250
+    ) -> Tuple[list[dict], str]:
+        """Retrieve the events changed since the previous incremental sync.
+
+        Deleted events are included, with their status set to "cancelled".
+
+        Args:
+            sync_token (str, optional): Sync token returned by the previous call. A full
+                sync is made when it is None or has expired.
+            max_results (int, optional): Number of events per page. Defaults to 250.
+
+        Returns:
+            Tuple[list[dict], str]: The changed events, and the sync token to use for the
+                next call. (None, None) if the request failed.
+        """
+        page_token = None
+        events = []
+        try:
+            # Read all the pages of changes, the sync token comes with the last one
+            while True:
+                event_results = (
+                    self.service.events()
+                    .list(
+                        calendarId=self.calendar_id,
+                        pageToken=page_token,
+                        syncToken=sync_token,
+                        maxResults=max_results,
+                        singleEvents=True,
+                        showDeleted=True,
+                    )
+                    .execute()
+                )
+                events += event_results.get("items", [])
+                page_token = event_results.get("nextPageToken")
+
+                if not page_token:
+                    return events, event_results.get("nextSyncToken")
+        except HttpError as error:
+            # The sync token expired, Google asks for a full sync
+            if error.resp.status == 410 and sync_token is not None:
+                logging.warning("Google Calendar sync token expired, full sync...")
+                return self.retrieve_changes(max_results=max_results)
+            logging.error(
+                "An HTTP error %d occurred:\n%s" % (error.resp.status, error.content)
+            )
+            return None, None
+
     def _get_user_email(self) -> str:
         return self.service.calendarList().get(calendarId="primary").execute()["id"]
 
@@ -107,7 +182,9 @@ class GoogleCalendarClient:
             new_event (Event): Notion event to add in Google Calendar
 
         Returns:
-            dict: The created event from Google Calendar as a dict.
+            dict: The created event from Google Calendar as a dict. If the event was
+                already created, the existing one, whose status is "cancelled" if it
+                was deleted since.
         """
 
         event = {
@@ -136,19 +213,47 @@ class GoogleCalendarClient:
             }
             update_conference = 1
 
-        ret = (
-            self.service.events()
-            .insert(
-                calendarId=self.calendar_id,
-                body=event,
-                conferenceDataVersion=update_conference,
-                sendUpdates="all",
+        # Derive the event id from the Notion page id, so that sending the same
+        # creation twice, e.g. when resuming an interrupted sync, is a no-op.
+        # Notion ids are hex UUIDs, which are valid Google Calendar ids without dashes.
+        if new_event.notion_id:
+            event["id"] = new_event.notion_id.replace("-", "")
+
+        try:
+            ret = (
+                self.service.events()
+                .insert(
+                    calendarId=self.calendar_id,
+                    body=event,
+                    conferenceDataVersion=update_conference,
+                    sendUpdates="all",
+                )
+                .execute()
             )
-            .execute()
-        )
+        except HttpError as error:
+            if error.resp.status != 409 or "id" not in event:
+                raise
+            # The event was already created, Google Calendar keeps the ids of the
+            # deleted events so it may be cancelled
+            ret = self.retrieve_event(event["id"])
 
         return ret
 
+    def retrieve_event(self, gcal_id: str) -> dict:
+        """Retrieve an event from Google Calendar, cancelled events included.
+
+        Args:
+            gcal_id (str): Google Calendar id of the event.
+
+        Returns:
+            dict: The event from Google Calendar as a dict.
+        """
+        return (
+            self.service.events()
+            .get(calendarId=self.calendar_id, eventId=gcal_id)
+            .execute()
+        )
+
     def update_event(self, google_event2update: Event) -> dict:
         """Update the event in Google Calendar.
 
@@ -158,11 +263,7 @@ class GoogleCalendarClient:
         Returns:
             dict: The updated event from Google Calendar as a dict.
         """
-        event2update = (
-            self.service.events()
-            .get(calendarId=self.calendar_id, eventId=google_event2update.gcal_id)
-            .execute()
-        )
+        event2update = self.retrieve_event(google_event2update.gcal_id)
 
         event2update["start"]["dateTime"] = google_event2update.date.start.isoformat()
         event2update["end"]["dateTime"] = google_event2update.date.end.isoformat()
@@ -218,6 +319,29 @@ class GoogleCalendarClient:
 
         return ret
 
+    def delete_event(self, gcal_id: str) -> bool:
+        """Delete the event in Google Calendar.
+
+        Args:
+            gcal_id (str): Google Calendar id of the event to delete.
+
+        Returns:
+            bool: True if the event is deleted, or was already deleted.
+        """
+        try:
+            self.service.events().delete(
+                calendarId=self.calendar_id, eventId=gcal_id, sendUpdates="all"
+            ).execute()
+        except HttpError as error:
+            # 404 and 410 mean the event is already gone
+            if error.resp.status not in (404, 410):
+                logging.error(
+                    "An HTTP error %d occurred:\n%s"
+                    % (error.resp.status, error.content)
+                )
+                return False
+        return True
+
 
 def main() -> None:
     google_cal_client = GoogleCalendarClient()
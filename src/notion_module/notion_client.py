@@ -7,10 +7,18 @@ from notion_x_google_calendar.models import Event
 
 class NotionClient:
     def __init__(
-        self, api_key=_NOTION_API_KEY, calendar_db_id=_NOTION_CALENDAR_DB_ID
+        self,
+        api_key=_NOTION_API_KEY,
+        calendar_db_id=_NOTION_CALENDAR_DB_ID,
+        session=None,
+        rate_limiter=None,
     ) -> None:
         self.api_key = api_key
         self.calendar_db_id = calendar_db_id
+        # Optional requests.Session reusing its connections, and RateLimiter applied
+        # to every request
+        self.session = session
+        self.rate_limiter = rate_limiter
 
     def make_request(self, method, endpoint, body=None) -> dict:
         authorization = f"Bearer {self.api_key}"
@@ -20,22 +28,34 @@ class NotionClient:
             "Notion-Version": "2022-06-28",
         }
         url = f"https://api.notion.com/v1/{endpoint}"
-        response = METHODS[method](url, headers=headers, json=body)
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait()
+        if self.session is not None:
+            response = self.session.request(method, url, headers=headers, json=body)
+        else:
+            response = METHODS[method](url, headers=headers, json=body)
         if response.status_code != 200:
             raise Exception(f"Error: {response.status_code}. {response.text}")
         return response.json()
 
     def list_events(self) -> list[dict]:
+        events = []
+        body = {"page_size": 100}
         try:
-            events = self.make_request(
-                "POST", f"databases/{self.calendar_db_id}/query"
-            )["results"]
-            return events
+            # Read all the pages of results, Notion returns at most 100 of them per page
+            while True:
+                ret = self.make_request(
+                    "POST", f"databases/{self.calendar_db_id}/query", body=body
+                )
+                events += ret["results"]
+                if not ret.get("has_more"):
+                    return events
+                body["start_cursor"] = ret["next_cursor"]
         except Exception as e:
             logging.error(f"An error occurred: {e}")
             return None
 
-    def update_event(self, notion_event_updated: Event) -> None:
+    def _build_body(self, notion_event_updated: Event) -> dict:
         # Default body initialization
         body = {
             "properties": {
@@ -108,10 +128,99 @@ class NotionClient:
                 "rich_text": [{"text": {"content": notion_event_updated.organizer}}]
             }
 
+        return body
+
+    def find_event(self, name: str, start: str) -> dict:
+        """Find a page of the calendar database by its name and start date.
+
+        Args:
+            name (str): Name of the event.
+            start (str): Start date of the event in ISO format.
+
+        Returns:
+            dict: The first matching page from Notion as a dict, None if there is none.
+        """
+        body = {
+            "filter": {
+                "and": [
+                    {"property": "Name", "title": {"equals": name}},
+                    {"property": "Date", "date": {"equals": start}},
+                ]
+            },
+            "page_size": 1,
+        }
         try:
-            ret = self.make_request(
+            results = self.make_request(
+                "POST", f"databases/{self.calendar_db_id}/query", body=body
+            )["results"]
+            return results[0] if results else None
+        except Exception as e:
+            logging.error(f"An error occurred: {e}")
+            return None
+
+    def update_event(self, notion_event_updated: Event) -> dict:
+        """Update the page of the event in Notion.
+
+        Args:
+            notion_event_updated (Event): Google Calendar event to update in Notion.
+
+        Returns:
+            dict: The updated page from Notion as a dict, None if the request failed.
+        """
+        body = self._build_body(notion_event_updated)
+        try:
+            return self.make_request(
                 "PATCH", f"pages/{notion_event_updated.notion_id}", body=body
             )
-            print(ret)
         except Exception as e:
             logging.error(f"An error occurred: {e}")
+            return None
+
+    def create_event(self, new_event: Event) -> dict:
+        """Create a new page in the Notion calendar database.
+
+        Args:
+            new_event (Event): Google Calendar event to add in Notion.
+
+        Returns:
+            dict: The created page from Notion as a dict, None if the request failed.
+        """
+        body = self._build_body(new_event)
+        body["parent"] = {"database_id": self.calendar_db_id}
+        try:
+            return self.make_request("POST", "pages", body=body)
+        except Exception as e:
+            logging.error(f"An error occurred: {e}")
+            return None
+
+    def retrieve_event(self, notion_id: str) -> dict:
+        """Retrieve a page from Notion, archived pages included.
+
+        Args:
+            notion_id (str): Notion page id of the event.
+
+        Returns:
+            dict: The page from Notion as a dict, None if the request failed.
+        """
+        try:
+            return self.make_request("GET", f"pages/{notion_id}")
+        except Exception as e:
+            logging.error(f"An error occurred: {e}")
+            return None
+
+    def archive_event(self, notion_id: str) -> dict:
+        """Archive a page in Notion, which is how pages are deleted through the API.
+
+        Args:
+            notion_id (str): Notion page id of the event to archive.
+
+        Returns:
+            dict: The archived page from Notion as a dict, None if the request failed.
+        """
+        try:
+            return self.make_request(
+                "PATCH", f"pages/{notion_id}", body={"archived": True}
+            )
+        except Exception as e:
+            logging.error(f"An error occurred: {e}")
+            return None
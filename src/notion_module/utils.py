@@ -1,7 +1,47 @@
+import threading
+import time
 import requests
 
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+
 METHODS = {
     "GET": requests.get,
     "POST": requests.post,
     "PATCH": requests.patch,
 }
+
+
+def build_session(adapter: HTTPAdapter = None) -> requests.Session:
+    """Build a session keeping its connections alive between requests.
+
+    Args:
+        adapter (HTTPAdapter, optional): Adapter holding the connection pools, to share
+            them between several sessions. A new one is used if None.
+
+    Returns:
+        requests.Session: The session, without cookies so that sessions sharing an
+            adapter never share any state.
+    """
+    session = requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    if adapter is not None:
+        session.mount("https://", adapter)
+    return session
+
+
+class RateLimiter:
+    """Space out the calls to wait() to stay under a number of requests per second."""
+
+    def __init__(self, requests_per_second: float) -> None:
+        self.interval = 1 / requests_per_second
+        self._next_request = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_request - now
+            self._next_request = max(now, self._next_request) + self.interval
+        if delay > 0:
+            time.sleep(delay)
@@ -1,33 +1,125 @@
 import notion_module.notion_client as notion_client
 import google_calendar_module.google_calendar_client as gcal_client
+import argparse
 import logging
 
-from .app import bi_directionnal_sync
+from .app import bi_directionnal_sync, replay, snapshot
+from .profiling import SamplingProfiler
+from .tenants import TenantPool, load_tenants
 
 
-def main():
+def connect():
     # Check if Notion API key and Calendar DB ID are valid
     notion_clt = notion_client.NotionClient()
     if notion_clt.api_key == None or notion_clt.api_key == "":
         logging.error("Notion API key is not set.")
-        return
+        return None
     if notion_clt.calendar_db_id == None or notion_clt.calendar_db_id == "":
         logging.error("No Notion calendar database id is set.")
-        return
+        return None
 
     # Check if a request to the Notion API can be made
     ret = notion_clt.make_request("GET", f"databases/{notion_clt.calendar_db_id}")
     if ret == None:
         logging.error("Notion API key or DB id is invalid.")
-        return
+        return None
 
     # Check if Google Calendar API key is valid
     gcal_clt = gcal_client.GoogleCalendarClient()
     if gcal_clt.service == None:
         logging.error("Google Calendar service is not set.")
+        return None
+
+    return notion_clt, gcal_clt
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="notion-x-google-calendar")
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Profile the cycle, and write its collapsed stacks to PATH.",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        metavar="N",
+        help="Parse the events in N processes, useful for very large calendars.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    snapshot_parser = subparsers.add_parser(
+        "snapshot", help="Save the events of both calendars to a snapshot file."
+    )
+    snapshot_parser.add_argument(
+        "path", help="Path of the snapshot file, e.g. snapshot.json.gz"
+    )
+    replay_parser = subparsers.add_parser(
+        "replay",
+        help="Run a cycle offline on a snapshot, and print the writes it would send.",
+    )
+    replay_parser.add_argument("path", help="Path of the snapshot file.")
+    tenants_parser = subparsers.add_parser(
+        "tenants", help="Synchronize the calendars of many tenants."
+    )
+    tenants_parser.add_argument(
+        "config", help="Path of the JSON file listing the tenants."
+    )
+    tenants_parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of tenants synchronized at the same time.",
+    )
+    tenants_parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Run one cycle of every tenant, instead of running forever.",
+    )
+    args = parser.parse_args()
+
+    if args.command == "tenants":
+        # Only the main thread is sampled, the cycles of the tenants run in workers
+        if args.profile:
+            parser.error("--profile can't be used with the tenants command.")
+        tenant_pool = TenantPool(load_tenants(args.config), workers=args.workers)
+        if args.once:
+            tenant_pool.run_once()
+        else:
+            tenant_pool.run_forever()
         return
 
-    bi_directionnal_sync(notion_client=notion_clt, google_cal_client=gcal_clt)
+    # A replay runs offline
+    if args.command != "replay":
+        clients = connect()
+        if clients is None:
+            return
+        notion_clt, gcal_clt = clients
+
+    profiler = SamplingProfiler() if args.profile else None
+    if profiler:
+        profiler.start()
+
+    try:
+        if args.command == "snapshot":
+            snapshot(
+                notion_client=notion_clt,
+                google_cal_client=gcal_clt,
+                path=args.path,
+                parse_workers=args.parse_workers,
+            )
+        elif args.command == "replay":
+            replay(path=args.path)
+        else:
+            bi_directionnal_sync(
+                notion_client=notion_clt,
+                google_cal_client=gcal_clt,
+                parse_workers=args.parse_workers,
+            )
+    finally:
+        if profiler:
+            profiler.stop()
+            profiler.write_collapsed(args.profile)
+            profiler.print_summary()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,11 @@
+from notion_x_google_calendar.factory import EventFactory
+from notion_x_google_calendar.replay import replay_snapshot
+from notion_x_google_calendar.snapshot import save_snapshot
 from notion_x_google_calendar.synchronizer import Synchronizer
 import logging
 
 
-def bi_directionnal_sync(notion_client, google_cal_client):
+def bi_directionnal_sync(notion_client, google_cal_client, parse_workers=None):
     # event_factory = EventFactory(
     #     notion_clt=notion_client, google_cal_clt=google_cal_client
     # )
@@ -11,8 +14,36 @@ def bi_directionnal_sync(notion_client, google_cal_client):
     # TODO: Implement bi-directionnal sync
 
     synchronizer = Synchronizer(
-        notion_clt=notion_client, google_cal_clt=google_cal_client
+        notion_clt=notion_client,
+        google_cal_clt=google_cal_client,
+        parse_workers=parse_workers,
     )
 
     logging.info("Synchronizing events...")
     synchronizer.bi_directionnal_sync()
+
+
+def snapshot(notion_client, google_cal_client, path, parse_workers=None):
+    event_factory = EventFactory(
+        notion_clt=notion_client,
+        google_cal_clt=google_cal_client,
+        workers=parse_workers,
+    )
+    notion_events, gcal_events = event_factory.build()
+
+    logging.info(f"Saving the snapshot to {path}...")
+    save_snapshot(path, notion_events.events, gcal_events.events)
+
+
+def replay(path):
+    logging.info(f"Replaying the snapshot {path}...")
+    notion_client, google_cal_client = replay_snapshot(path)
+
+    for name, client in (
+        ("Notion", notion_client),
+        ("Google Calendar", google_cal_client),
+    ):
+        writes = ", ".join(
+            f"{count} {method}" for method, count in client.writes.items()
+        )
+        print(f"{name}: {writes or 'no writes'}")
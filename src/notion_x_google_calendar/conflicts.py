@@ -0,0 +1,77 @@
+import datetime
+
+from typing import Tuple
+from .models import Event, event_from_dict, event_to_dict, to_datetime
+
+# Fields of an event kept in sync between Notion and Google Calendar
+SYNCED_FIELDS = (
+    "name",
+    "description",
+    "location",
+    "date_start",
+    "date_end",
+    "attendees",
+    "is_video_conference",
+    "meeting_link",
+    "going",
+)
+
+
+def event_fields(event: Event) -> dict:
+    """JSON compatible values of the synchronized fields of an event."""
+    event_dict = event_to_dict(event)
+    fields = {field: event_dict[field] for field in SYNCED_FIELDS}
+    # Notion attendees are split on "," and keep the spaces around the emails
+    if fields["attendees"] is not None:
+        fields["attendees"] = sorted({attendee.strip() for attendee in event.attendees})
+    return fields
+
+
+def apply_fields(event: Event, fields: dict) -> Event:
+    """Copy of the event with the given synchronized fields replaced."""
+    return event_from_dict({**event_to_dict(event), **fields})
+
+
+def changed_fields(fields: dict, base: dict) -> dict:
+    """Fields edited on one side since the last synchronization of the event."""
+    return {
+        field: value for field, value in fields.items() if value != base.get(field)
+    }
+
+
+def parse_version(last_updated: str) -> datetime.datetime:
+    # Both APIs use a "Z" suffix, not supported by fromisoformat before Python 3.11
+    return to_datetime(last_updated.replace("Z", "+00:00"))
+
+
+def _same_value(field: str, notion_value, gcal_value) -> bool:
+    if field in ("date_start", "date_end") and notion_value and gcal_value:
+        # Notion and Google Calendar may return the same time in different timezones
+        return to_datetime(notion_value) == to_datetime(gcal_value)
+    return notion_value == gcal_value
+
+
+def merge(notion_changes: dict, gcal_changes: dict) -> Tuple[dict, dict, dict]:
+    """Merge field by field the edits made on each side since the last sync.
+
+    Args:
+        notion_changes (dict): Fields edited in Notion.
+        gcal_changes (dict): Fields edited in Google Calendar.
+
+    Returns:
+        Tuple[dict, dict, dict]: The fields to write to Google Calendar, the fields to
+            write to Notion, and the conflicting fields edited differently on both sides.
+    """
+    to_gcal, to_notion, conflicts = {}, {}, {}
+    for field in SYNCED_FIELDS:
+        if field in notion_changes and field in gcal_changes:
+            if not _same_value(field, notion_changes[field], gcal_changes[field]):
+                conflicts[field] = {
+                    "notion": notion_changes[field],
+                    "gcal": gcal_changes[field],
+                }
+        elif field in notion_changes:
+            to_gcal[field] = notion_changes[field]
+        elif field in gcal_changes:
+            to_notion[field] = gcal_changes[field]
+    return to_gcal, to_notion, conflicts
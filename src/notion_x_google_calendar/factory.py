@@ -1,111 +1,182 @@
 import logging
 import datetime
+import multiprocessing
 import pytz
 
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from typing import Tuple
-from .models import Event, EventHashTable
+from .models import Event, EventHashTable, to_datetime
 from notion_module.notion_client import NotionClient
 from google_calendar_module.google_calendar_client import GoogleCalendarClient
 
 
+def _parse_timestamp(value: str, timestamps: dict) -> datetime.datetime:
+    # Many events share the same start and end times, parse each of them only once
+    if value is None:
+        return None
+    if value not in timestamps:
+        timestamps[value] = to_datetime(value)
+    return timestamps[value]
+
+
+def parse_gcal_event(gcal_event: dict, timestamps: dict = None) -> Event:
+    # TODO: Use the .get() method instead of [] and if/else statements
+    timestamps = {} if timestamps is None else timestamps
+    going = None
+    attendees = gcal_event.get("attendees")
+    if attendees:
+        for attendee in attendees:
+            if attendee.get("self"):
+                going = attendee.get("responseStatus")
+            break
+
+    event = Event(
+        notion_id=None,
+        gcal_id=gcal_event["id"],
+        name=gcal_event["summary"],
+        description=gcal_event["description"]
+        if "description" in gcal_event
+        else None,
+        date_start=_parse_timestamp(gcal_event["start"]["dateTime"], timestamps),
+        date_end=_parse_timestamp(gcal_event["end"]["dateTime"], timestamps),
+        location=gcal_event["location"] if "location" in gcal_event else None,
+        calendar_type="Work",
+        attendees={attendee["email"] for attendee in gcal_event["attendees"]}
+        if "attendees" in gcal_event
+        else None,
+        meeting_link=gcal_event["hangoutLink"]
+        if "hangoutLink" in gcal_event
+        else None,
+        is_video_conference="conferenceData" in gcal_event,
+        going=going,
+        organizer=gcal_event["organizer"]["email"]
+        if "displayName" not in gcal_event["organizer"]
+        else gcal_event["organizer"]["displayName"],
+        last_updated=gcal_event["updated"],
+    )
+    return event
+
+
+def parse_notion_event(notion_event: dict, timestamps: dict = None) -> Event:
+    # TODO: Use the .get() method instead of [] and if/else statements
+    timestamps = {} if timestamps is None else timestamps
+    event = Event(
+        notion_id=notion_event["id"],
+        gcal_id=None,
+        name=notion_event["properties"]["Name"]["title"][0]["plain_text"]
+        if notion_event["properties"]["Name"]["title"]
+        else None,
+        description=notion_event["properties"]["Description"]["rich_text"][0][
+            "plain_text"
+        ]
+        if notion_event["properties"]["Description"]["rich_text"]
+        else None,
+        date_start=_parse_timestamp(
+            notion_event["properties"]["Date"]["date"]["start"], timestamps
+        )
+        if notion_event["properties"]["Date"]["date"]
+        else None,
+        date_end=_parse_timestamp(
+            notion_event["properties"]["Date"]["date"]["end"], timestamps
+        )
+        if notion_event["properties"]["Date"]["date"]
+        else None,
+        location=notion_event["properties"]["Location"]["rich_text"][0]["plain_text"]
+        if notion_event["properties"]["Location"]["rich_text"]
+        else None,
+        calendar_type=notion_event["properties"]["Calendar"]["select"]["name"]
+        if notion_event["properties"]["Calendar"]["select"]
+        else None,
+        attendees=set(
+            notion_event["properties"]["Attendees"]["rich_text"][0][
+                "plain_text"
+            ].split(",")
+        )
+        if notion_event["properties"]["Attendees"]["rich_text"]
+        else None,
+        meeting_link=notion_event["properties"]["Meeting Link"]["url"]
+        if notion_event["properties"]["Meeting Link"]["url"]
+        else None,
+        is_video_conference=notion_event["properties"]["Video conference?"][
+            "checkbox"
+        ],
+        going=None,
+        organizer=notion_event["properties"]["Organizer"]["rich_text"][0]["plain_text"]
+        if notion_event["properties"]["Organizer"]["rich_text"]
+        else None,
+        last_updated=notion_event["last_edited_time"],
+    )
+    event.is_going_notion = (
+        notion_event["properties"]["Going?"]["select"]["name"]
+        if notion_event["properties"]["Going?"]["select"]
+        else None
+    )
+
+    return event
+
+
+def _parse_notion_chunk(
+    notion_events: list[dict], now: datetime.datetime
+) -> list[Event]:
+    timestamps = {}
+    events = []
+    for notion_event in notion_events:
+        event = parse_notion_event(notion_event, timestamps)
+
+        # Skip if the event is in the past
+        if (event.date.end and event.date.end.astimezone(pytz.utc) < now) or (
+            event.date.start.astimezone(pytz.utc) < now
+        ):
+            continue
+        events.append(event)
+    return events
+
+
+def _parse_gcal_chunk(gcal_events: list[dict]) -> list[Event]:
+    timestamps = {}
+    return [parse_gcal_event(gcal_event, timestamps) for gcal_event in gcal_events]
+
+
 class EventFactory:
     def __init__(
-        self, notion_clt: NotionClient, google_cal_clt: GoogleCalendarClient
+        self,
+        notion_clt: NotionClient,
+        google_cal_clt: GoogleCalendarClient,
+        workers: int = None,
+        chunk_size: int = 1000,
     ) -> None:
         self.notion_clt = notion_clt
         self.gcal_clt = google_cal_clt
+        # Raw events are parsed by chunks of chunk_size, spread over a pool of workers
+        # processes, or in the current process if workers is None
+        self.workers = workers
+        self.chunk_size = chunk_size
 
     def parse_gcal_event(self, gcal_event: dict) -> Event:
-        # TODO: Use the .get() method instead of [] and if/else statements
-        going = None
-        attendees = gcal_event.get("attendees")
-        if attendees:
-            for attendee in attendees:
-                if attendee.get("self"):
-                    going = attendee.get("responseStatus")
-                break
-
-        event = Event(
-            notion_id=None,
-            gcal_id=gcal_event["id"],
-            name=gcal_event["summary"],
-            description=gcal_event["description"]
-            if "description" in gcal_event
-            else None,
-            date_start=gcal_event["start"]["dateTime"],
-            date_end=gcal_event["end"]["dateTime"],
-            location=gcal_event["location"] if "location" in gcal_event else None,
-            calendar_type="Work",
-            attendees={attendee["email"] for attendee in gcal_event["attendees"]}
-            if "attendees" in gcal_event
-            else None,
-            meeting_link=gcal_event["hangoutLink"]
-            if "hangoutLink" in gcal_event
-            else None,
-            is_video_conference="conferenceData" in gcal_event,
-            going=going,
-            organizer=gcal_event["organizer"]["email"]
-            if "displayName" not in gcal_event["organizer"]
-            else gcal_event["organizer"]["displayName"],
-            last_updated=gcal_event["updated"],
-        )
-        return event
+        return parse_gcal_event(gcal_event)
 
     def parse_notion_event(self, notion_event: dict) -> Event:
-        # TODO: Use the .get() method instead of [] and if/else statements
-        event = Event(
-            notion_id=notion_event["id"],
-            gcal_id=None,
-            name=notion_event["properties"]["Name"]["title"][0]["plain_text"]
-            if notion_event["properties"]["Name"]["title"]
-            else None,
-            description=notion_event["properties"]["Description"]["rich_text"][0][
-                "plain_text"
-            ]
-            if notion_event["properties"]["Description"]["rich_text"]
-            else None,
-            date_start=notion_event["properties"]["Date"]["date"]["start"]
-            if notion_event["properties"]["Date"]["date"]
-            else None,
-            date_end=notion_event["properties"]["Date"]["date"]["end"]
-            if notion_event["properties"]["Date"]["date"]
-            else None,
-            location=notion_event["properties"]["Location"]["rich_text"][0][
-                "plain_text"
-            ]
-            if notion_event["properties"]["Location"]["rich_text"]
-            else None,
-            calendar_type=notion_event["properties"]["Calendar"]["select"]["name"]
-            if notion_event["properties"]["Calendar"]["select"]
-            else None,
-            attendees=set(
-                notion_event["properties"]["Attendees"]["rich_text"][0][
-                    "plain_text"
-                ].split(",")
-            )
-            if notion_event["properties"]["Attendees"]["rich_text"]
-            else None,
-            meeting_link=notion_event["properties"]["Meeting Link"]["url"]
-            if notion_event["properties"]["Meeting Link"]["url"]
-            else None,
-            is_video_conference=notion_event["properties"]["Video conference?"][
-                "checkbox"
-            ],
-            going=None,
-            organizer=notion_event["properties"]["Organizer"]["rich_text"][0][
-                "plain_text"
-            ]
-            if notion_event["properties"]["Organizer"]["rich_text"]
-            else None,
-            last_updated=notion_event["last_edited_time"],
-        )
-        event.is_going_notion = (
-            notion_event["properties"]["Going?"]["select"]["name"]
-            if notion_event["properties"]["Going?"]["select"]
-            else None
-        )
-
-        return event
+        return parse_notion_event(notion_event)
+
+    def _parse_chunks(self, parse_chunk, raw_events: list[dict]) -> list[Event]:
+        chunks = [
+            raw_events[i : i + self.chunk_size]
+            for i in range(0, len(raw_events), self.chunk_size)
+        ]
+
+        # A process pool is only worth its start-up cost with several chunks
+        if self.workers and len(chunks) > 1:
+            # Forking a process running other threads, e.g. the workers of a
+            # TenantPool, may copy locks they hold and deadlock the child processes
+            with ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                parsed_chunks = list(executor.map(parse_chunk, chunks))
+        else:
+            parsed_chunks = [parse_chunk(chunk) for chunk in chunks]
+
+        return [event for parsed_chunk in parsed_chunks for event in parsed_chunk]
 
     def build(self) -> Tuple[EventHashTable, EventHashTable]:
         """Builds a list of Events from Notion and Google Calendar, in a formatted way to be used by the synchronizer.
@@ -115,26 +186,12 @@ class EventFactory:
         """
         notion_events = self.get_notion_events()
         gcal_events = self.get_google_calendar_events()
-        formatted_gcal_events = []
-        formatted_notion_events = []
-
-        for notion_event in notion_events:
-            event = self.parse_notion_event(notion_event)
 
-            # Skip if the event is in the past
-            utc = pytz.utc
-
-            if (
-                event.date.end
-                and event.date.end.astimezone(utc) < datetime.datetime.now(tz=utc)
-            ) or (event.date.start.astimezone(utc) < datetime.datetime.now(tz=utc)):
-                continue
-            formatted_notion_events.append(event)
-
-        for gcal_event in gcal_events:
-            event = self.parse_gcal_event(gcal_event)
-
-            formatted_gcal_events.append(event)
+        now = datetime.datetime.now(tz=pytz.utc)
+        formatted_notion_events = self._parse_chunks(
+            partial(_parse_notion_chunk, now=now), notion_events
+        )
+        formatted_gcal_events = self._parse_chunks(_parse_gcal_chunk, gcal_events)
 
         return EventHashTable(formatted_notion_events), EventHashTable(
             formatted_gcal_events
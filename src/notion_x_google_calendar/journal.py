@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+
+# Number of times an operation is sent before giving up on it
+MAX_ATTEMPTS = 5
+
+
+class Journal:
+    """Append-only journal of the operations sent during a synchronization cycle.
+
+    Each operation is written with its idempotency key before being sent ("intent"),
+    then written again once it succeeded ("done"). At the end of a cycle, the journal
+    is compacted to the operations left unfinished, to be retried by the next one.
+
+    The journal is kept in memory only when path is None, e.g. to replay a snapshot.
+    """
+
+    def __init__(self, path="sync_journal.jsonl") -> None:
+        self.path = path
+        self._records = []
+
+    def _append(self, record: dict) -> None:
+        if self.path is None:
+            self._records.append(record)
+            return
+        with open(self.path, "a") as journal_file:
+            journal_file.write(json.dumps(record) + "\n")
+            journal_file.flush()
+            # The record must be on disk before the operation is sent
+            os.fsync(journal_file.fileno())
+
+    def intent(self, operation: str, key: str, **data) -> None:
+        self._append({"operation": operation, "key": key, "status": "intent", **data})
+
+    def done(self, operation: str, key: str, **data) -> None:
+        self._append({"operation": operation, "key": key, "status": "done", **data})
+
+    def records(self) -> list[dict]:
+        if self.path is None:
+            return list(self._records)
+        if not os.path.exists(self.path):
+            return []
+
+        records = []
+        with open(self.path, "r") as journal_file:
+            for line in journal_file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # The last record may be truncated if the process died writing it
+                    logging.warning(f"Skipping an invalid journal record: {line!r}")
+        return records
+
+    def _pending_intents(self) -> dict[tuple, list[dict]]:
+        pending = {}
+        for record in self.records():
+            operation = (record["operation"], record["key"])
+            if record["status"] == "intent":
+                pending.setdefault(operation, []).append(record)
+            else:
+                pending.pop(operation, None)
+        return pending
+
+    def pending(self) -> list[dict]:
+        """Operations with an intent but no matching done record, in journal order.
+
+        Each one is its last intent, with the number of times it was sent as
+        "attempts".
+        """
+        return [
+            {**intents[-1], "attempts": len(intents)}
+            for intents in self._pending_intents().values()
+        ]
+
+    def completed(self) -> list[dict]:
+        return [record for record in self.records() if record["status"] == "done"]
+
+    def compact(self, max_attempts: int = MAX_ATTEMPTS) -> None:
+        """Only keep the intents of the unfinished operations, and drop the ones sent
+        max_attempts times already."""
+        records = []
+        for (operation, key), intents in self._pending_intents().items():
+            if len(intents) >= max_attempts:
+                logging.error(
+                    f"Giving up on {operation} for {key} after {len(intents)} attempts."
+                )
+                continue
+            records += intents
+
+        if not records:
+            self.clear()
+            return
+        if self.path is None:
+            self._records = records
+            return
+
+        # Write to a temporary file first so a crash never loses the journal
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as journal_file:
+            journal_file.writelines(json.dumps(record) + "\n" for record in records)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        self._records = []
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
@@ -67,10 +67,45 @@ class Event:
         self.going = is_going_dict.get(value, None)
 
 
+def event_to_dict(event: Event) -> dict:
+    """Serialize an event into a JSON compatible dict of the Event arguments."""
+    return {
+        "notion_id": event.notion_id,
+        "gcal_id": event.gcal_id,
+        "name": event.name,
+        "description": event.description,
+        "location": event.location,
+        "is_video_conference": event.is_video_conference,
+        "meeting_link": event.meeting_link,
+        "going": event.going,
+        "organizer": event.organizer,
+        "last_updated": event.last_updated,
+        "date_start": event.date.start.isoformat() if event.date.start else None,
+        "date_end": event.date.end.isoformat() if event.date.end else None,
+        "attendees": sorted(event.attendees) if event.attendees else None,
+        "calendar_type": event.calendar_type,
+    }
+
+
+def event_from_dict(data: dict) -> Event:
+    """Build an event back from the output of event_to_dict."""
+    arguments = dict(data)
+    if arguments["attendees"] is not None:
+        arguments["attendees"] = set(arguments["attendees"])
+    return Event(**arguments)
+
+
+def to_datetime(value) -> datetime.datetime:
+    """Parse an ISO formatted timestamp, already parsed datetimes are returned as is."""
+    if value is None or isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.fromisoformat(value)
+
+
 class Date:
     def __init__(self, start, end=None) -> None:
-        self.start = datetime.datetime.fromisoformat(start)
-        self.end = datetime.datetime.fromisoformat(end) if end is not None else None
+        self.start = to_datetime(start)
+        self.end = to_datetime(end)
 
     def duration(self) -> datetime.timedelta:
         if self.end is None:
@@ -96,3 +131,9 @@ class EventHashTable:
 
     def get_event(self, event_name: str, start_date: datetime) -> Event:
         return self.hash_table.get(hash((event_name, start_date)), None)
+
+    def remove_event(self, event: Event) -> None:
+        key = hash((event.name, event.date.start))
+        if self.hash_table.get(key) is event:
+            del self.hash_table[key]
+        self.events.remove(event)
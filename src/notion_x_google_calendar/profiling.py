@@ -0,0 +1,113 @@
+import collections
+import sys
+import threading
+
+# Stages of a synchronization cycle, with the frames they are recognized by. A sample
+# belongs to the stage of its innermost recognized frame.
+STAGES = (
+    (
+        "network wait",
+        lambda module, function: module.startswith(
+            ("socket", "ssl", "selectors", "http.client", "httplib2", "urllib3")
+        ),
+    ),
+    (
+        "JSON decoding",
+        # json.dumps and json.encoder are left out, the requests bodies are encoded
+        lambda module, function: module == "json.decoder"
+        or (module == "json" and function == "loads"),
+    ),
+    (
+        "EventFactory parsing",
+        lambda module, function: (
+            module == "notion_x_google_calendar.factory" and "parse" in function
+        )
+        # Events built from a snapshot when replaying a cycle
+        or (
+            module == "notion_x_google_calendar.snapshot"
+            and function in ("build", "load_snapshot", "_from_columns")
+        ),
+    ),
+    (
+        "EventHashTable building",
+        lambda module, function: module == "notion_x_google_calendar.models"
+        and function == "build_hash_table",
+    ),
+    (
+        "Synchronizer decisions",
+        lambda module, function: module == "notion_x_google_calendar.synchronizer",
+    ),
+)
+
+
+class SamplingProfiler:
+    """Sample the stack of the thread that started the profiler at a fixed interval.
+
+    Only the current process is sampled, parsing workers of the EventFactory are not.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples = collections.Counter()
+        self._thread_id = None
+        self._sampler = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        self._thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._sampler.join()
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(
+                    (frame.f_globals.get("__name__", "?"), frame.f_code.co_name)
+                )
+                frame = frame.f_back
+            # Root first, as expected by the collapsed stack format
+            self.samples[tuple(reversed(stack))] += 1
+
+    def write_collapsed(self, path: str) -> None:
+        """Write the samples as collapsed stacks, as read by flamegraph.pl."""
+        with open(path, "w") as collapsed_file:
+            for stack, count in self.samples.most_common():
+                frames = ";".join(f"{module}:{function}" for module, function in stack)
+                collapsed_file.write(f"{frames} {count}\n")
+
+    def stages(self) -> dict[str, int]:
+        """Number of samples spent in each stage of the cycle."""
+        stages = collections.Counter()
+        for stack, count in self.samples.items():
+            stages[self._stage(stack)] += count
+        return dict(stages)
+
+    @staticmethod
+    def _stage(stack: tuple) -> str:
+        for module, function in reversed(stack):
+            for stage, is_in_stage in STAGES:
+                if is_in_stage(module, function):
+                    return stage
+        return "other"
+
+    def print_summary(self) -> None:
+        total = sum(self.samples.values())
+        print(f"{total} samples, every {self.interval * 1000:g} ms:")
+        if not total:
+            return
+        for stage, count in sorted(self.stages().items(), key=lambda item: -item[1]):
+            print(f"  {stage:<25} {count * self.interval:8.2f}s {count / total:6.1%}")
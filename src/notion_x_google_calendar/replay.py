@@ -0,0 +1,161 @@
+import collections
+import datetime
+import uuid
+
+from typing import Tuple
+from .journal import Journal
+from .models import Event
+from .snapshot import SnapshotEventFactory
+from .state import SyncState
+from .synchronizer import Synchronizer
+
+
+def _now() -> str:
+    return datetime.datetime.now(tz=datetime.timezone.utc).isoformat()
+
+
+def _rich_text(content: str) -> dict:
+    return {"rich_text": [{"plain_text": content}] if content else []}
+
+
+class RecordingGoogleCalendarClient:
+    """Stand-in for GoogleCalendarClient recording the writes instead of sending them.
+
+    It answers like the API would, so the synchronizer can parse the responses.
+    """
+
+    def __init__(self) -> None:
+        self.writes = collections.Counter()
+        self.events = {}
+
+    def _record(self, method: str, event: Event, gcal_id: str) -> dict:
+        self.writes[method] += 1
+        raw_event = {
+            "id": gcal_id,
+            "status": "confirmed",
+            "summary": event.name,
+            "start": {"dateTime": event.date.start.isoformat()},
+            "end": {"dateTime": (event.date.end or event.date.start).isoformat()},
+            "organizer": {"email": event.organizer or ""},
+            "updated": _now(),
+        }
+        if event.description:
+            raw_event["description"] = event.description
+        if event.location:
+            raw_event["location"] = event.location
+        if event.attendees:
+            raw_event["attendees"] = [
+                {"email": attendee.strip()} for attendee in event.attendees
+            ]
+        if event.is_video_conference:
+            raw_event["conferenceData"] = {}
+            raw_event["hangoutLink"] = (
+                event.meeting_link or f"https://meet.google.com/{gcal_id}"
+            )
+        self.events[gcal_id] = raw_event
+        return raw_event
+
+    def retrieve_changes(self, sync_token=None) -> Tuple[list[dict], str]:
+        return [], None
+
+    def retrieve_event(self, gcal_id: str) -> dict:
+        return self.events.get(gcal_id)
+
+    def create_event(self, new_event: Event) -> dict:
+        gcal_id = new_event.notion_id.replace("-", "")
+        return self._record("create", new_event, gcal_id)
+
+    def update_event(self, google_event2update: Event) -> dict:
+        return self._record(
+            "update", google_event2update, google_event2update.gcal_id
+        )
+
+    def delete_event(self, gcal_id: str) -> bool:
+        self.writes["delete"] += 1
+        return True
+
+
+class RecordingNotionClient:
+    """Stand-in for NotionClient recording the writes instead of sending them.
+
+    It answers like the API would, so the synchronizer can parse the responses.
+    """
+
+    def __init__(self) -> None:
+        self.writes = collections.Counter()
+
+    def _record(self, method: str, event: Event, notion_id: str) -> dict:
+        self.writes[method] += 1
+        return {
+            "id": notion_id,
+            "archived": False,
+            "last_edited_time": _now(),
+            "properties": {
+                "Name": {"title": [{"plain_text": event.name}] if event.name else []},
+                "Description": _rich_text(event.description),
+                "Date": {
+                    "date": {
+                        "start": event.date.start.isoformat(),
+                        "end": event.date.end.isoformat() if event.date.end else None,
+                    }
+                },
+                "Location": _rich_text(event.location),
+                "Calendar": {"select": {"name": event.calendar_type}},
+                "Attendees": _rich_text(
+                    ", ".join(sorted(event.attendees)) if event.attendees else None
+                ),
+                "Meeting Link": {"url": event.meeting_link},
+                "Video conference?": {"checkbox": event.is_video_conference},
+                "Organizer": _rich_text(event.organizer),
+                "Going?": {
+                    "select": {"name": event.is_going_notion}
+                    if event.is_going_notion
+                    else None
+                },
+            },
+        }
+
+    def retrieve_event(self, notion_id: str) -> dict:
+        return None
+
+    def find_event(self, name: str, start: str) -> dict:
+        return None
+
+    def create_event(self, new_event: Event) -> dict:
+        return self._record("create", new_event, str(uuid.uuid4()))
+
+    def update_event(self, notion_event_updated: Event) -> dict:
+        return self._record(
+            "update", notion_event_updated, notion_event_updated.notion_id
+        )
+
+    def archive_event(self, notion_id: str) -> dict:
+        self.writes["archive"] += 1
+        return {"id": notion_id, "archived": True}
+
+
+def replay_snapshot(
+    path: str,
+) -> Tuple[RecordingNotionClient, RecordingGoogleCalendarClient]:
+    """Run a synchronization cycle on a snapshot, without any network access.
+
+    The state and journal are kept in memory, and the writes are only recorded.
+
+    Args:
+        path (str): Path of the snapshot file.
+
+    Returns:
+        Tuple[RecordingNotionClient, RecordingGoogleCalendarClient]: The clients, with
+            the writes the cycle would have sent to each side.
+    """
+    notion_clt = RecordingNotionClient()
+    google_cal_clt = RecordingGoogleCalendarClient()
+    synchronizer = Synchronizer(
+        notion_clt=notion_clt,
+        google_cal_clt=google_cal_clt,
+        state=SyncState(path=None),
+        journal=Journal(path=None),
+        event_factory=SnapshotEventFactory(path),
+    )
+    synchronizer.bi_directionnal_sync()
+    return notion_clt, google_cal_clt
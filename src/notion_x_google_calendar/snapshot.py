@@ -0,0 +1,90 @@
+import gzip
+import json
+
+from typing import Tuple
+from .models import Event, EventHashTable, event_from_dict, event_to_dict
+from .factory import EventFactory
+
+SNAPSHOT_VERSION = 1
+
+# Arguments of Event, in the order of the snapshot columns
+EVENT_FIELDS = (
+    "notion_id",
+    "gcal_id",
+    "name",
+    "description",
+    "location",
+    "is_video_conference",
+    "meeting_link",
+    "going",
+    "organizer",
+    "last_updated",
+    "date_start",
+    "date_end",
+    "attendees",
+    "calendar_type",
+)
+
+
+def _to_columns(events: list[Event]) -> dict[str, list]:
+    columns = {field: [] for field in EVENT_FIELDS}
+    for event in events:
+        for field, value in event_to_dict(event).items():
+            columns[field].append(value)
+    return columns
+
+
+def _from_columns(columns: dict[str, list]) -> list[Event]:
+    rows = zip(*(columns[field] for field in EVENT_FIELDS))
+    return [event_from_dict(dict(zip(EVENT_FIELDS, row))) for row in rows]
+
+
+def save_snapshot(
+    path: str, notion_events: list[Event], gcal_events: list[Event]
+) -> None:
+    """Save the parsed events of both calendars to a gzipped, columnar JSON file.
+
+    Args:
+        path (str): Path of the snapshot file.
+        notion_events (list[Event]): Events parsed from Notion.
+        gcal_events (list[Event]): Events parsed from Google Calendar.
+    """
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "notion": _to_columns(notion_events),
+        "gcal": _to_columns(gcal_events),
+    }
+    with gzip.open(path, "wt", encoding="utf-8") as snapshot_file:
+        json.dump(snapshot, snapshot_file, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_snapshot(path: str) -> Tuple[EventHashTable, EventHashTable]:
+    """Load a snapshot saved by save_snapshot.
+
+    Args:
+        path (str): Path of the snapshot file.
+
+    Returns:
+        Tuple[EventHashTable, EventHashTable]: A tuple of two EventHashTable, one for Notion events, and one for Google Calendar events.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as snapshot_file:
+        snapshot = json.load(snapshot_file)
+
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {snapshot.get('version')}")
+
+    return EventHashTable(_from_columns(snapshot["notion"])), EventHashTable(
+        _from_columns(snapshot["gcal"])
+    )
+
+
+class SnapshotEventFactory(EventFactory):
+    """EventFactory reading the events from a snapshot instead of the APIs, to replay
+    a synchronization offline."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(notion_clt=None, google_cal_clt=None)
+        self.path = path
+
+    def build(self) -> Tuple[EventHashTable, EventHashTable]:
+        return load_snapshot(self.path)
@@ -0,0 +1,135 @@
+import datetime
+import json
+import logging
+import os
+
+# Tombstones older than this are dropped, the deleted events are long gone from both
+# listings by then. The tombstone of a restored event is renewed while it is listed.
+TOMBSTONE_TTL = datetime.timedelta(days=30)
+
+
+class SyncState:
+    """State kept between two synchronization cycles.
+
+    It stores the links between Notion pages and Google Calendar events, with the
+    version and fields of both sides as of their last synchronization, the conflicts
+    left to solve, the tombstones of the deleted events, and the Google Calendar
+    incremental sync token.
+
+    The state is kept in memory only when path is None, e.g. to replay a snapshot.
+    """
+
+    def __init__(self, path="sync_state.json") -> None:
+        self.path = path
+        # notion_id -> {"gcal_id", "notion_version", "gcal_version", "notion_fields",
+        # "gcal_fields"}, the versions and fields are missing until the first sync
+        self.links = {}
+        # notion_id -> {field: {"notion": value, "gcal": value}}
+        self.conflicts = {}
+        # source ("notion" or "gcal") -> {event id: deletion time in ISO format}
+        self.tombstones = {"notion": {}, "gcal": {}}
+        self.gcal_sync_token = None
+        self._notion_ids = {}  # gcal_id -> notion_id
+        self.load()
+
+    def load(self) -> None:
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not read the sync state, starting from scratch: {e}")
+            return
+
+        self.links = state.get("links", {})
+        self.conflicts = state.get("conflicts", {})
+        self.tombstones.update(state.get("tombstones", {}))
+        self.gcal_sync_token = state.get("gcal_sync_token")
+        self._notion_ids = {
+            link["gcal_id"]: notion_id for notion_id, link in self.links.items()
+        }
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        state = {
+            "links": self.links,
+            "conflicts": self.conflicts,
+            "tombstones": self.tombstones,
+            "gcal_sync_token": self.gcal_sync_token,
+        }
+        # Write to a temporary file first so a crash never leaves a truncated state
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as state_file:
+            json.dump(state, state_file)
+        os.replace(tmp_path, self.path)
+
+    def link(self, notion_id: str, gcal_id: str) -> None:
+        if notion_id is None or gcal_id is None:
+            return
+        previous_gcal_id = self.get_gcal_id(notion_id)
+        if previous_gcal_id == gcal_id:
+            return
+        if previous_gcal_id is not None:
+            del self._notion_ids[previous_gcal_id]
+        # A new link starts without any synchronized version
+        self.links[notion_id] = {"gcal_id": gcal_id}
+        self._notion_ids[gcal_id] = notion_id
+
+    def unlink(self, notion_id: str) -> None:
+        self.conflicts.pop(notion_id, None)
+        link = self.links.pop(notion_id, None)
+        if link is not None:
+            self._notion_ids.pop(link["gcal_id"], None)
+
+    def record_sync(
+        self,
+        notion_id: str,
+        notion_version: str,
+        gcal_version: str,
+        notion_fields: dict,
+        gcal_fields: dict,
+    ) -> None:
+        """Record the version and fields of both sides of a linked event, as they are
+        once synchronized."""
+        self.links[notion_id].update(
+            notion_version=notion_version,
+            gcal_version=gcal_version,
+            notion_fields=notion_fields,
+            gcal_fields=gcal_fields,
+        )
+
+    def set_conflicts(self, notion_id: str, conflicts: dict) -> None:
+        if conflicts:
+            self.conflicts[notion_id] = conflicts
+        else:
+            self.conflicts.pop(notion_id, None)
+
+    def get_link(self, notion_id: str) -> dict:
+        return self.links.get(notion_id)
+
+    def get_gcal_id(self, notion_id: str) -> str:
+        return self.links.get(notion_id, {}).get("gcal_id")
+
+    def get_notion_id(self, gcal_id: str) -> str:
+        return self._notion_ids.get(gcal_id)
+
+    def add_tombstone(self, source: str, event_id: str) -> None:
+        if event_id is None:
+            return
+        self.tombstones[source][event_id] = datetime.datetime.now(
+            tz=datetime.timezone.utc
+        ).isoformat()
+
+    def is_tombstoned(self, source: str, event_id: str) -> bool:
+        return event_id in self.tombstones[source]
+
+    def prune_tombstones(self) -> None:
+        limit = datetime.datetime.now(tz=datetime.timezone.utc) - TOMBSTONE_TTL
+        for source, tombstones in self.tombstones.items():
+            self.tombstones[source] = {
+                event_id: deleted_at
+                for event_id, deleted_at in tombstones.items()
+                if datetime.datetime.fromisoformat(deleted_at) > limit
+            }
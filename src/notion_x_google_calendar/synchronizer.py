@@ -1,116 +1,543 @@
-from .models import Event
+from .models import Event, EventHashTable, event_from_dict, event_to_dict
 from .factory import EventFactory
+from .conflicts import apply_fields, changed_fields, event_fields, merge, parse_version
+from .journal import MAX_ATTEMPTS, Journal
+from .state import SyncState
 from notion_module.notion_client import NotionClient
 from google_calendar_module.google_calendar_client import GoogleCalendarClient
 from typing import Tuple
 import logging
 
+# Journaled operations left to the next synchronization of their pair to finish
+UPDATE_OPERATIONS = ("update_gcal", "update_notion", "conference_update")
+
 
 class Synchronizer:
     def __init__(
-        self, notion_clt: NotionClient, google_cal_clt: GoogleCalendarClient
+        self,
+        notion_clt: NotionClient,
+        google_cal_clt: GoogleCalendarClient,
+        state: SyncState = None,
+        event_factory: EventFactory = None,
+        journal: Journal = None,
+        parse_workers: int = None,
     ) -> None:
         self.notion_clt = notion_clt
         self.google_cal_clt = google_cal_clt
-        self.event_factory = EventFactory(
-            notion_clt=notion_clt, google_cal_clt=google_cal_clt
+        self.state = state if state is not None else SyncState()
+        self.journal = journal if journal is not None else Journal()
+        self.event_factory = (
+            event_factory
+            if event_factory is not None
+            else EventFactory(
+                notion_clt=notion_clt,
+                google_cal_clt=google_cal_clt,
+                workers=parse_workers,
+            )
         )
 
-    def _send_conference_update(self, notion_id: str, raw_gcal_event: dict) -> None:
+    def _send_conference_update(self, notion_id: str, raw_gcal_event: dict) -> dict:
         """Send the updated conference link to Notion.
 
         Args:
             notion_id (str): Notion page id corresponding to the event.
             raw_gcal_event (dict): Raw Google Calendar event comming from the API.
+
+        Returns:
+            dict: The updated page from Notion as a dict, None if the request failed.
         """
+        self.journal.intent(
+            "conference_update", notion_id, gcal_id=raw_gcal_event["id"]
+        )
         parsed_gcal_event = self.event_factory.parse_gcal_event(raw_gcal_event)
         parsed_gcal_event.notion_id = notion_id
-        self.notion_clt.update_event(notion_event_updated=parsed_gcal_event)
+        new_notion_event = self.notion_clt.update_event(
+            notion_event_updated=parsed_gcal_event
+        )
+        if new_notion_event is not None:
+            self.journal.done("conference_update", notion_id)
+        return new_notion_event
+
+    def _written_version(self, raw_event: dict) -> Tuple[str, dict]:
+        """Version and synchronized fields of an event, as returned by the API after
+        one of our writes.
+
+        Recording them as the last synced version makes our own writes look unchanged
+        on the next cycle, so they are not synchronized back to the other side.
+
+        Args:
+            raw_event (dict): Raw Google Calendar event or Notion page.
+
+        Returns:
+            Tuple[str, dict]: The version of the event and its synchronized fields.
+        """
+        if "last_edited_time" in raw_event:
+            event = self.event_factory.parse_notion_event(raw_event)
+        else:
+            event = self.event_factory.parse_gcal_event(raw_event)
+        return event.last_updated, event_fields(event)
+
+    def _create_gcal_event(self, notion_event: Event) -> dict:
+        """Create the Notion event in Google Calendar, then send the meeting link of the
+        new conference back to Notion.
+
+        Args:
+            notion_event (Event): Notion event to create in Google Calendar.
+
+        Returns:
+            dict: The created event from Google Calendar as a dict, cancelled if the
+                event was already created and deleted.
+        """
+        # The Google Calendar event id is derived from the notion_id, which makes the
+        # creation idempotent
+        self.journal.intent(
+            "create_gcal", notion_event.notion_id, event=event_to_dict(notion_event)
+        )
+        new_gcal_event = self.google_cal_clt.create_event(notion_event)
+
+        # Google Calendar keeps the ids of the deleted events, so the event of a page
+        # may have been created and deleted before
+        if new_gcal_event.get("status") == "cancelled":
+            logging.warning(
+                f"Event {notion_event.name} was deleted from Google Calendar, it is "
+                "not created again."
+            )
+            self._forget_pair(notion_event.notion_id, new_gcal_event["id"])
+            self.journal.done(
+                "create_gcal",
+                notion_event.notion_id,
+                gcal_id=new_gcal_event["id"],
+                cancelled=True,
+            )
+            return new_gcal_event
+
+        self.state.link(notion_event.notion_id, new_gcal_event["id"])
+        self.journal.done(
+            "create_gcal", notion_event.notion_id, gcal_id=new_gcal_event["id"]
+        )
+        notion_version, notion_fields = (
+            notion_event.last_updated,
+            event_fields(notion_event),
+        )
+        gcal_version, gcal_fields = self._written_version(new_gcal_event)
+
+        # Check if a new conference needs to be created,
+        # then update the meeting link on Notion
+        if (
+            notion_event.is_video_conference
+            and new_gcal_event.get("hangoutLink") is not None
+        ):
+            new_notion_event = self._send_conference_update(
+                notion_id=notion_event.notion_id, raw_gcal_event=new_gcal_event
+            )
+            if new_notion_event is None:
+                # Compare the Google Calendar fields next cycle, to send the meeting
+                # link again
+                gcal_fields["meeting_link"] = None
+                gcal_version = None
+            else:
+                notion_version, notion_fields = self._written_version(new_notion_event)
+
+        self.state.record_sync(
+            notion_event.notion_id,
+            notion_version=notion_version,
+            gcal_version=gcal_version,
+            notion_fields=notion_fields,
+            gcal_fields=gcal_fields,
+        )
+        return new_gcal_event
+
+    def _update_gcal_event(self, notion_event: Event) -> dict:
+        self.journal.intent(
+            "update_gcal", notion_event.gcal_id, event=event_to_dict(notion_event)
+        )
+        new_gcal_event = self.google_cal_clt.update_event(
+            google_event2update=notion_event
+        )
+        self.journal.done("update_gcal", notion_event.gcal_id)
+        return new_gcal_event
+
+    def _update_notion_event(self, gcal_event: Event) -> dict:
+        self.journal.intent(
+            "update_notion", gcal_event.notion_id, event=event_to_dict(gcal_event)
+        )
+        new_notion_event = self.notion_clt.update_event(notion_event_updated=gcal_event)
+        if new_notion_event is not None:
+            self.journal.done("update_notion", gcal_event.notion_id)
+        return new_notion_event
+
+    def _create_notion_event(self, gcal_event: Event) -> dict:
+        """Create the Google Calendar event in Notion.
+
+        Args:
+            gcal_event (Event): Google Calendar event to create in Notion.
+
+        Returns:
+            dict: The created page from Notion as a dict, None if the request failed.
+        """
+        self.journal.intent(
+            "create_notion", gcal_event.gcal_id, event=event_to_dict(gcal_event)
+        )
+        new_notion_event = self.notion_clt.create_event(gcal_event)
+        if new_notion_event is None:
+            return None
+        self._link_notion_event(new_notion_event, gcal_event)
+        return new_notion_event
+
+    def _link_notion_event(self, new_notion_event: dict, gcal_event: Event) -> None:
+        """Link the page created from a Google Calendar event, and record both sides
+        as synchronized.
+
+        Args:
+            new_notion_event (dict): The created page from Notion as a dict.
+            gcal_event (Event): Google Calendar event the page was created from.
+        """
+        self.state.link(new_notion_event["id"], gcal_event.gcal_id)
+        self.journal.done(
+            "create_notion", gcal_event.gcal_id, notion_id=new_notion_event["id"]
+        )
+        notion_version, notion_fields = self._written_version(new_notion_event)
+        self.state.record_sync(
+            new_notion_event["id"],
+            notion_version=notion_version,
+            gcal_version=gcal_event.last_updated,
+            notion_fields=notion_fields,
+            gcal_fields=event_fields(gcal_event),
+        )
+
+    def _forget_pair(self, notion_id: str, gcal_id: str) -> None:
+        """Tombstone both sides of a deleted event, so neither is created again."""
+        self.state.add_tombstone("gcal", gcal_id)
+        self.state.add_tombstone("notion", notion_id)
+        self.state.unlink(notion_id)
+
+    def _archive_notion_event(self, notion_id: str, gcal_id: str) -> bool:
+        """Archive the Notion page of a cancelled Google Calendar event.
+
+        Args:
+            notion_id (str): Id of the Notion page to archive.
+            gcal_id (str): Id of the cancelled Google Calendar event.
+
+        Returns:
+            bool: True if the page was archived, False otherwise.
+        """
+        self.journal.intent("archive_notion", notion_id, gcal_id=gcal_id)
+        if self.notion_clt.archive_event(notion_id) is None:
+            return False
+        self._forget_pair(notion_id, gcal_id)
+        self.journal.done("archive_notion", notion_id, gcal_id=gcal_id)
+        return True
+
+    def _delete_gcal_event(self, gcal_id: str, notion_id: str) -> bool:
+        """Delete the Google Calendar event of an archived Notion page.
+
+        Args:
+            gcal_id (str): Id of the Google Calendar event to delete.
+            notion_id (str): Id of the archived Notion page.
+
+        Returns:
+            bool: True if the event was deleted, False otherwise.
+        """
+        self.journal.intent("delete_gcal", gcal_id, notion_id=notion_id)
+        if not self.google_cal_clt.delete_event(gcal_id):
+            return False
+        self._forget_pair(notion_id, gcal_id)
+        self.journal.done("delete_gcal", gcal_id, notion_id=notion_id)
+        return True
+
+    def _replay(self, record: dict) -> None:
+        """Send again an operation of the journal that was not confirmed as done."""
+        operation = record["operation"]
+        logging.info(f"Replaying {operation} for {record['key']}...")
+
+        if operation == "create_gcal":
+            self._create_gcal_event(event_from_dict(record["event"]))
+
+        elif operation == "create_notion":
+            # Notion has no idempotency key, look for a page created before the crash
+            gcal_event = event_from_dict(record["event"])
+            notion_page = self.notion_clt.find_event(
+                gcal_event.name, gcal_event.date.start.isoformat()
+            )
+            if notion_page is None:
+                self._create_notion_event(gcal_event)
+            else:
+                self._link_notion_event(notion_page, gcal_event)
+
+        elif operation == "archive_notion":
+            self._archive_notion_event(record["key"], record["gcal_id"])
+
+        elif operation == "delete_gcal":
+            self._delete_gcal_event(record["key"], record["notion_id"])
+
+    def resume(self) -> None:
+        """Send again the operations left unfinished by the previous cycles."""
+        if not self.journal.records():
+            return
+
+        logging.info("Resuming the unfinished operations...")
+
+        # The links of the completed creations, and the tombstones of the completed
+        # deletions, may not have been saved before the crash
+        for record in self.journal.completed():
+            if record["operation"] == "create_gcal" and record.get("cancelled"):
+                self._forget_pair(record["key"], record["gcal_id"])
+            elif record["operation"] == "create_gcal":
+                self.state.link(record["key"], record["gcal_id"])
+            elif record["operation"] == "create_notion":
+                self.state.link(record["notion_id"], record["key"])
+            elif record["operation"] == "archive_notion":
+                self._forget_pair(record["key"], record["gcal_id"])
+            elif record["operation"] == "delete_gcal":
+                self._forget_pair(record["notion_id"], record["key"])
+
+        for record in self.journal.pending():
+            # An unfinished update is sent again when its pair is synchronized, from
+            # the last synchronized base. Replaying the event saved in the journal
+            # would overwrite the edits made since on the updated side.
+            if record["operation"] in UPDATE_OPERATIONS:
+                self.journal.done(record["operation"], record["key"])
+                continue
+            # Dropped when the journal is compacted
+            if record["attempts"] >= MAX_ATTEMPTS:
+                continue
+            try:
+                self._replay(record)
+            except Exception as e:
+                logging.error(
+                    f"Could not replay {record['operation']} for {record['key']}: {e}"
+                )
+
+    def _propagate_deletions(
+        self,
+        notion_event_hashtable: EventHashTable,
+        gcal_event_hashtable: EventHashTable,
+    ) -> None:
+        """Propagate the deletions made since the last cycle to the other side, and
+        drop the deleted events from the hash tables so they are not created again.
+
+        Args:
+            notion_event_hashtable (EventHashTable): Events listed from Notion.
+            gcal_event_hashtable (EventHashTable): Events listed from Google Calendar.
+        """
+        # Cancelled Google Calendar events come from the incremental sync
+        changes, sync_token = self.google_cal_clt.retrieve_changes(
+            sync_token=self.state.gcal_sync_token
+        )
+        archive_failed = False
+
+        # Listed events tombstoned by a previous cycle were restored by the user
+        restored_events = [
+            event
+            for event in notion_event_hashtable.events
+            if self.state.is_tombstoned("notion", event.notion_id)
+        ] + [
+            event
+            for event in gcal_event_hashtable.events
+            if self.state.is_tombstoned("gcal", event.gcal_id)
+        ]
+        for raw_gcal_event in changes or []:
+            if raw_gcal_event.get("status") != "cancelled":
+                continue
+            notion_id = self.state.get_notion_id(raw_gcal_event["id"])
+            if notion_id is None:
+                continue
+
+            logging.info(f"Event {raw_gcal_event['id']} cancelled, archiving it...")
+            if not self._archive_notion_event(notion_id, raw_gcal_event["id"]):
+                archive_failed = True
+
+        # Archived pages are never listed by Notion, so only the linked events missing
+        # from the Notion listing need to be checked
+        listed_notion_ids = {event.notion_id for event in notion_event_hashtable.events}
+        for gcal_event in gcal_event_hashtable.events:
+            notion_id = self.state.get_notion_id(gcal_event.gcal_id)
+            if notion_id is None or notion_id in listed_notion_ids:
+                continue
+
+            notion_page = self.notion_clt.retrieve_event(notion_id)
+            if notion_page is None or not notion_page.get("archived"):
+                continue
+
+            logging.info(f"Page {notion_id} archived, deleting the event...")
+            self._delete_gcal_event(gcal_event.gcal_id, notion_id)
+
+        for notion_event in list(notion_event_hashtable.events):
+            if self.state.is_tombstoned("notion", notion_event.notion_id):
+                notion_event_hashtable.remove_event(notion_event)
+        for gcal_event in list(gcal_event_hashtable.events):
+            if self.state.is_tombstoned("gcal", gcal_event.gcal_id):
+                gcal_event_hashtable.remove_event(gcal_event)
+
+        # A restored event keeps its tombstone while it is listed, so it is not created
+        # again on the other side once the tombstone would have expired
+        for event in restored_events:
+            logging.warning(
+                f"Skipping the event {event.name}, restored after being deleted on "
+                "the other side."
+            )
+            if event.notion_id is not None:
+                self.state.add_tombstone("notion", event.notion_id)
+            else:
+                self.state.add_tombstone("gcal", event.gcal_id)
+        self.state.prune_tombstones()
+
+        # Keep the previous token if a request failed, to get the changes next time
+        if sync_token is not None and not archive_failed:
+            self.state.gcal_sync_token = sync_token
 
     def bi_directionnal_sync(self) -> None:
+        try:
+            self.resume()
+            self._sync()
+        finally:
+            # Save the links and tombstones even if the cycle failed halfway
+            self.state.save()
+            # Only forget the operations once the state they led to is saved, the
+            # unfinished ones are kept to be retried next cycle
+            self.journal.compact()
+
+    def _sync_pair(self, notion_event: Event, gcal_event: Event) -> None:
+        """Propagate the edits made on each side of a linked event since its last
+        synchronization, and record the conflicting ones.
+
+        Args:
+            notion_event (Event): Notion side of the event.
+            gcal_event (Event): Google Calendar side of the event.
+        """
+        link = self.state.get_link(notion_event.notion_id)
+        notion_fields = event_fields(notion_event)
+        gcal_fields = event_fields(gcal_event)
+
+        # First synchronization of the pair, no common base to compare the edits with
+        if "notion_fields" not in link:
+            notion_version = parse_version(notion_event.last_updated)
+            gcal_version = parse_version(gcal_event.last_updated)
+            notion_changes = notion_fields if notion_version > gcal_version else {}
+            gcal_changes = gcal_fields if gcal_version > notion_version else {}
+
+        else:
+            # Notion rounds last_edited_time to the minute, its fields are always
+            # compared to catch the edits made in the same minute as the last sync.
+            # The conflicting fields are compared as well, even if Google Calendar
+            # was not edited since, so they are not overwritten by the Notion side
+            notion_changes = changed_fields(notion_fields, link["notion_fields"])
+            gcal_changes = (
+                changed_fields(gcal_fields, link["gcal_fields"])
+                if gcal_event.last_updated != link["gcal_version"]
+                or notion_event.notion_id in self.state.conflicts
+                else {}
+            )
+
+        to_gcal, to_notion, conflicts = merge(notion_changes, gcal_changes)
+        if conflicts:
+            logging.warning(
+                f"Event {notion_event.name} edited on both sides, conflicting fields "
+                f"left as they are: {', '.join(conflicts)}"
+            )
+        self.state.set_conflicts(notion_event.notion_id, conflicts)
+
+        notion_version = notion_event.last_updated
+        gcal_version = gcal_event.last_updated
+
+        if to_gcal:
+            gcal_event2update = apply_fields(gcal_event, to_gcal)
+            gcal_event2update.notion_id = notion_event.notion_id
+            new_gcal_event = self._update_gcal_event(gcal_event2update)
+            gcal_version, gcal_fields = self._written_version(new_gcal_event)
+
+            # Check if a new conference was created,
+            # then send the meeting link to Notion with the other updates
+            if (
+                gcal_event2update.is_video_conference
+                and gcal_event.meeting_link is None
+                and new_gcal_event.get("hangoutLink") is not None
+            ):
+                to_notion["meeting_link"] = new_gcal_event["hangoutLink"]
+
+        if to_notion:
+            new_notion_event = self._update_notion_event(
+                apply_fields(notion_event, to_notion)
+            )
+            if new_notion_event is None:
+                # Keep the previous Google Calendar base of the fields, and compare
+                # them next cycle even if the event is not edited, to send them again
+                for field in to_notion:
+                    gcal_fields[field] = link.get("gcal_fields", {}).get(field)
+                gcal_version = None
+            else:
+                notion_version, notion_fields = self._written_version(new_notion_event)
+
+        # The conflicting fields keep their last agreed value as base, so they are
+        # still seen as edited on both sides until they agree again
+        for field in conflicts:
+            notion_fields[field] = link["notion_fields"].get(field)
+            gcal_fields[field] = link["gcal_fields"].get(field)
+
+        self.state.record_sync(
+            notion_event.notion_id,
+            notion_version=notion_version,
+            gcal_version=gcal_version,
+            notion_fields=notion_fields,
+            gcal_fields=gcal_fields,
+        )
+
+    def _sync(self) -> None:
         notion_event_hashtable, gcal_event_hashtable = self.event_factory.build()
+        self._propagate_deletions(notion_event_hashtable, gcal_event_hashtable)
 
-        # Synchro notion -> gcal, and remove the synced events from the list,
-        # only keep the events that need to be synced
-        for notion_event_hash in notion_event_hashtable.hash_table:
-            # The event exists in both Notion and Google Calendar with same name and date
-            # Update the event in case there are changes according to the last_updated field
-            if notion_event_hash in gcal_event_hashtable.hash_table:
-                notion_event = notion_event_hashtable.hash_table[notion_event_hash]
-                gcal_event = gcal_event_hashtable.hash_table[notion_event_hash]
-
-                if notion_event.last_updated > gcal_event.last_updated:
-                    notion_event.gcal_id = gcal_event.gcal_id
-                    new_gcal_event = self.google_cal_clt.update_event(
-                        google_event2update=notion_event
-                    )
-
-                    # Check if a new conference needs to be created,
-                    # then update the meeting link on Notion
-                    if (
-                        notion_event.is_video_conference
-                        and gcal_event.meeting_link is None
-                        and new_gcal_event["hangoutLink"] is not None
-                    ):
-                        self._send_conference_update(
-                            notion_id=notion_event.notion_id,
-                            raw_gcal_event=new_gcal_event,
-                        )
-                        # parsed_gcal_event = self.event_factory.parse_gcal_event(
-                        #     new_gcal_event
-                        # )
-                        # parsed_gcal_event.notion_id = notion_event.notion_id
-
-                        # self.notion_clt.update_event(
-                        #     notion_event_updated=parsed_gcal_event
-                        # )
-
-                elif notion_event.last_updated < gcal_event.last_updated:
-                    gcal_event.notion_id = notion_event.notion_id
-                    self.notion_clt.update_event(notion_event_updated=gcal_event)
-
-                else:
-                    continue
-                del gcal_event_hashtable.hash_table[notion_event_hash]
-
-            # The event exists in Notion but not in Google Calendar
-            # Create the event in Google Calendar
+        gcal_events = {event.gcal_id: event for event in gcal_event_hashtable.events}
+        paired_gcal_ids = set()
+
+        for notion_event in notion_event_hashtable.hash_table.values():
+            gcal_id = self.state.get_gcal_id(notion_event.notion_id)
+
+            # The linked event is paired by id, so renames and moves are synchronized
+            if gcal_id is not None:
+                gcal_event = gcal_events.get(gcal_id)
+
+            # Otherwise pair it with an unlinked event of same name and date
             else:
-                notion_event = notion_event_hashtable.hash_table[notion_event_hash]
-                new_gcal_event = self.google_cal_clt.create_event(notion_event)
-
-                # Check if a new conference needs to be created,
-                # then update the meeting link on Notion
-                if (
-                    notion_event.is_video_conference
-                    and new_gcal_event["hangoutLink"] is not None
+                gcal_event = gcal_event_hashtable.get_event(
+                    notion_event.name, notion_event.date.start
+                )
+                if gcal_event is not None and (
+                    self.state.get_notion_id(gcal_event.gcal_id) is not None
                 ):
-                    self._send_conference_update(
-                        notion_id=notion_event.notion_id, raw_gcal_event=new_gcal_event
-                    )
+                    gcal_event = None
+
+            # A failing event must not stop the synchronization of the other ones,
+            # its unfinished operation stays in the journal to be retried
+            try:
+                if gcal_event is not None:
+                    self.state.link(notion_event.notion_id, gcal_event.gcal_id)
+                    paired_gcal_ids.add(gcal_event.gcal_id)
+                    self._sync_pair(notion_event, gcal_event)
 
-                    # parsed_gcal_event = self.event_factory.parse_gcal_event(
-                    #     new_gcal_event
-                    # )
-                    # parsed_gcal_event.notion_id = notion_event.notion_id
+                # The event exists in Notion but not in Google Calendar
+                # Create the event in Google Calendar
+                elif gcal_id is None:
+                    self._create_gcal_event(notion_event)
 
-                    # self.notion_clt.update_event(notion_event_updated=parsed_gcal_event)
-        for google_event_hash in gcal_event_hashtable.hash_table:
+                # Linked to an event out of the Google Calendar listing, e.g. past
+
+            except Exception as e:
+                logging.error(
+                    f"Could not synchronize the event {notion_event.name}: {e}"
+                )
+
+        for gcal_event in gcal_event_hashtable.hash_table.values():
             # The event exists in Google Calendar but not in Notion
+            if (
+                gcal_event.gcal_id in paired_gcal_ids
+                or self.state.get_notion_id(gcal_event.gcal_id) is not None
+            ):
+                continue
 
-            gcal_event = gcal_event_hashtable.hash_table[google_event_hash]
-            new_notion_event = self.notion_clt.create_event(gcal_event)
-
-            # if notion_event.name in gcal_event_hashtable:
-            #     gcal_event = gcal_event_hashtable.get_event(notion_event.name)
-            #     if notion_event.last_updated > gcal_event.last_updated:
-            #         self.event_factory.update_event(notion_event, gcal_event)
-            #     elif notion_event.last_updated < gcal_event.last_updated:
-            #         self.event_factory.update_event(gcal_event, notion_event)
-            #     else:
-            #         continue
-            #     notion_event_hashtable.remove_event(notion_event)
-            #     gcal_event_hashtable.remove_event(gcal_event)
+            try:
+                self._create_notion_event(gcal_event)
+            except Exception as e:
+                logging.error(f"Could not synchronize the event {gcal_event.name}: {e}")
 
     def make_pair(self, events: list[Event]) -> list[tuple[Event, Event]]:
         pairs = []
@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from .journal import Journal
+from .state import SyncState
+from .synchronizer import Synchronizer
+from notion_module.notion_client import NotionClient
+from notion_module.utils import RateLimiter, build_session
+from google_calendar_module.google_calendar_client import GoogleCalendarClient
+
+# Longest delay before retrying a tenant whose cycles keep failing, in seconds
+MAX_BACKOFF = 3600
+
+
+class Tenant:
+    """A user synchronized by the TenantPool, with its own credentials and files.
+
+    The Google Calendar token, the sync state and the journal of the tenant are all
+    kept in its directory.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        notion_api_key: str,
+        notion_calendar_db_id: str,
+        directory: str,
+        calendar_id: str = "primary",
+        interval: float = 300,
+        notion_requests_per_second: float = 3,
+        parse_workers: int = None,
+    ) -> None:
+        self.name = name
+        self.notion_api_key = notion_api_key
+        self.notion_calendar_db_id = notion_calendar_db_id
+        self.directory = directory
+        self.calendar_id = calendar_id
+        self.interval = interval
+        # Notion rate limits each integration, not each process
+        self.rate_limiter = RateLimiter(notion_requests_per_second)
+        self.parse_workers = parse_workers
+
+        self.next_run = time.monotonic()
+        self.failures = 0
+        self.synchronizer = None
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    def build_synchronizer(self, adapter: HTTPAdapter) -> Synchronizer:
+        notion_clt = NotionClient(
+            api_key=self.notion_api_key,
+            calendar_db_id=self.notion_calendar_db_id,
+            session=build_session(adapter),
+            rate_limiter=self.rate_limiter,
+        )
+        google_cal_clt = GoogleCalendarClient(
+            calendar_id=self.calendar_id,
+            token_path=self.path("token.json"),
+            credentials_path=self.path("credentials.json"),
+            # The user can't log in from a browser opened by a worker
+            interactive=False,
+        )
+        return Synchronizer(
+            notion_clt=notion_clt,
+            google_cal_clt=google_cal_clt,
+            state=SyncState(self.path("sync_state.json")),
+            journal=Journal(self.path("sync_journal.jsonl")),
+            parse_workers=self.parse_workers,
+        )
+
+
+def load_tenants(path: str) -> list[Tenant]:
+    """Load the tenants from a JSON file holding a list of Tenant arguments.
+
+    A relative tenant directory is relative to the directory of the file.
+    """
+    with open(path, "r") as tenants_file:
+        tenants = [Tenant(**config) for config in json.load(tenants_file)]
+
+    for tenant in tenants:
+        tenant.directory = os.path.join(os.path.dirname(path), tenant.directory)
+    return tenants
+
+
+class TenantPool:
+    """Run the synchronization cycles of many tenants on a bounded pool of threads.
+
+    The tenants share the connection pools to the Notion API. A failing tenant is
+    retried with an exponential backoff and never delays the other ones.
+    """
+
+    def __init__(self, tenants: list[Tenant], workers: int = 4) -> None:
+        self.tenants = tenants
+        self.workers = workers
+        # Google Calendar clients keep their own connections, httplib2 is not thread
+        # safe, but they are reused from one cycle of their tenant to the next
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def _run_tenant(self, tenant: Tenant) -> None:
+        try:
+            if tenant.synchronizer is None:
+                tenant.synchronizer = tenant.build_synchronizer(self.adapter)
+
+            logging.info(f"[{tenant.name}] Synchronizing events...")
+            tenant.synchronizer.bi_directionnal_sync()
+            tenant.failures = 0
+            tenant.next_run = time.monotonic() + tenant.interval
+
+        except Exception as e:
+            tenant.failures += 1
+            backoff = min(tenant.interval * 2**tenant.failures, MAX_BACKOFF)
+            logging.error(
+                f"[{tenant.name}] Synchronization failed ({tenant.failures} in a row), "
+                f"retrying in {backoff:.0f}s: {e}"
+            )
+            # Rebuild the clients in case they were the cause of the failure
+            tenant.synchronizer = None
+            tenant.next_run = time.monotonic() + backoff
+
+        finally:
+            with self._lock:
+                self._running.discard(tenant)
+
+    def run_once(self) -> None:
+        """Run one synchronization cycle of every tenant."""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for tenant in self.tenants:
+                with self._lock:
+                    self._running.add(tenant)
+                executor.submit(self._run_tenant, tenant)
+
+    def run_forever(self, poll_interval: float = 1) -> None:
+        """Run the cycle of every tenant each time its interval has elapsed."""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                now = time.monotonic()
+                for tenant in self.tenants:
+                    with self._lock:
+                        # A tenant never has two cycles running at the same time
+                        if tenant in self._running or tenant.next_run > now:
+                            continue
+                        self._running.add(tenant)
+                    executor.submit(self._run_tenant, tenant)
+                time.sleep(poll_interval)
@@ -0,0 +1,36 @@
+import pytest
+
+from notion_x_google_calendar.journal import Journal
+from notion_x_google_calendar.state import SyncState
+from notion_x_google_calendar.synchronizer import Synchronizer
+from .fakes import FakeGoogleCalendarClient, FakeNotionClient
+
+
+@pytest.fixture
+def notion_clt() -> FakeNotionClient:
+    return FakeNotionClient()
+
+
+@pytest.fixture
+def google_cal_clt() -> FakeGoogleCalendarClient:
+    return FakeGoogleCalendarClient()
+
+
+@pytest.fixture
+def state() -> SyncState:
+    return SyncState(path=None)
+
+
+@pytest.fixture
+def journal() -> Journal:
+    return Journal(path=None)
+
+
+@pytest.fixture
+def synchronizer(notion_clt, google_cal_clt, state, journal) -> Synchronizer:
+    return Synchronizer(
+        notion_clt=notion_clt,
+        google_cal_clt=google_cal_clt,
+        state=state,
+        journal=journal,
+    )
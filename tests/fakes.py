@@ -0,0 +1,108 @@
+import datetime
+
+from typing import Tuple
+from notion_x_google_calendar.conflicts import apply_fields
+from notion_x_google_calendar.factory import parse_gcal_event, parse_notion_event
+from notion_x_google_calendar.models import Event
+from notion_x_google_calendar.replay import (
+    RecordingGoogleCalendarClient,
+    RecordingNotionClient,
+)
+
+
+def make_event(name: str = "Meeting", **fields) -> Event:
+    start = datetime.datetime.now(tz=datetime.timezone.utc).replace(
+        microsecond=0
+    ) + datetime.timedelta(days=1)
+    arguments = dict(
+        notion_id=None,
+        gcal_id=None,
+        name=name,
+        description=None,
+        location=None,
+        is_video_conference=False,
+        meeting_link=None,
+        going=None,
+        organizer="me@example.com",
+        last_updated=None,
+        date_start=start,
+        date_end=start + datetime.timedelta(hours=1),
+        attendees=None,
+        calendar_type="Work",
+    )
+    arguments.update(fields)
+    return Event(**arguments)
+
+
+class FakeNotionClient(RecordingNotionClient):
+    """Notion database kept in memory, on top of the recorded writes."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.pages = {}
+
+    def _record(self, method: str, event: Event, notion_id: str) -> dict:
+        page = super()._record(method, event, notion_id)
+        self.pages[notion_id] = page
+        return page
+
+    def list_events(self) -> list[dict]:
+        return [page for page in self.pages.values() if not page["archived"]]
+
+    def retrieve_event(self, notion_id: str) -> dict:
+        return self.pages.get(notion_id)
+
+    def find_event(self, name: str, start: str) -> dict:
+        for page in self.list_events():
+            event = parse_notion_event(page)
+            if event.name == name and event.date.start.isoformat() == start:
+                return page
+        return None
+
+    def archive_event(self, notion_id: str) -> dict:
+        super().archive_event(notion_id)
+        self.pages[notion_id]["archived"] = True
+        return self.pages[notion_id]
+
+    def edit(self, notion_id: str, **fields) -> None:
+        """Edit a page like a user would, counted apart from the updates."""
+        event = apply_fields(parse_notion_event(self.pages[notion_id]), fields)
+        self._record("edit", event, notion_id)
+
+
+class FakeGoogleCalendarClient(RecordingGoogleCalendarClient):
+    """Google Calendar kept in memory, on top of the recorded writes."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.changes = []
+
+    def create_event(self, new_event: Event) -> dict:
+        # Like the API, an id already used, even by a deleted event, is not reused
+        gcal_id = new_event.notion_id.replace("-", "")
+        if gcal_id in self.events:
+            return self.events[gcal_id]
+        return super().create_event(new_event)
+
+    def retrieve_events(self, now: str) -> list[dict]:
+        return [
+            event for event in self.events.values() if event["status"] != "cancelled"
+        ]
+
+    def retrieve_changes(self, sync_token=None) -> Tuple[list[dict], str]:
+        changes, self.changes = self.changes, []
+        return changes, "sync-token"
+
+    def delete_event(self, gcal_id: str) -> bool:
+        super().delete_event(gcal_id)
+        self.events[gcal_id]["status"] = "cancelled"
+        return True
+
+    def edit(self, gcal_id: str, **fields) -> None:
+        """Edit an event like a user would, counted apart from the updates."""
+        event = apply_fields(parse_gcal_event(self.events[gcal_id]), fields)
+        self._record("edit", event, gcal_id)
+
+    def cancel(self, gcal_id: str) -> None:
+        self.events[gcal_id]["status"] = "cancelled"
+        self.changes.append(self.events[gcal_id])
@@ -0,0 +1,57 @@
+import pytest
+
+from notion_x_google_calendar.conflicts import changed_fields, merge
+
+
+@pytest.mark.parametrize(
+    "notion_changes, gcal_changes, expected",
+    [
+        # Nothing edited
+        ({}, {}, ({}, {}, {})),
+        # Edited in Notion only
+        ({"name": "A"}, {}, ({"name": "A"}, {}, {})),
+        # Edited in Google Calendar only
+        ({}, {"location": "B"}, ({}, {"location": "B"}, {})),
+        # Different fields edited on each side
+        (
+            {"name": "A"},
+            {"location": "B"},
+            ({"name": "A"}, {"location": "B"}, {}),
+        ),
+        # Same field edited the same way on both sides
+        ({"name": "A"}, {"name": "A"}, ({}, {}, {})),
+        # Same field edited differently on both sides
+        (
+            {"name": "A"},
+            {"name": "B"},
+            ({}, {}, {"name": {"notion": "A", "gcal": "B"}}),
+        ),
+        # A conflict does not prevent the other fields from being merged
+        (
+            {"name": "A", "description": "D"},
+            {"name": "B", "location": "L"},
+            (
+                {"description": "D"},
+                {"location": "L"},
+                {"name": {"notion": "A", "gcal": "B"}},
+            ),
+        ),
+        # The same time in two timezones is not a conflict
+        (
+            {"date_start": "2030-01-01T10:00:00+00:00"},
+            {"date_start": "2030-01-01T11:00:00+01:00"},
+            ({}, {}, {}),
+        ),
+    ],
+)
+def test_merge(notion_changes, gcal_changes, expected):
+    assert merge(notion_changes, gcal_changes) == expected
+
+
+def test_changed_fields():
+    base = {"name": "A", "location": None}
+    assert changed_fields({"name": "A", "location": None}, base) == {}
+    assert changed_fields({"name": "B", "location": "L"}, base) == {
+        "name": "B",
+        "location": "L",
+    }
@@ -0,0 +1,31 @@
+from notion_x_google_calendar.factory import EventFactory
+from notion_x_google_calendar.models import EventHashTable, event_to_dict
+from .fakes import FakeGoogleCalendarClient, FakeNotionClient, make_event
+
+
+def _as_dicts(event_hashtable: EventHashTable) -> tuple:
+    return (
+        [event_to_dict(event) for event in event_hashtable.events],
+        {
+            key: event_to_dict(event)
+            for key, event in event_hashtable.hash_table.items()
+        },
+    )
+
+
+def test_pooled_parsing_matches_serial_parsing():
+    notion_clt = FakeNotionClient()
+    google_cal_clt = FakeGoogleCalendarClient()
+    for i in range(25):
+        event = make_event(f"Meeting {i}", attendees={"a@example.com"})
+        notion_clt.create_event(event)
+        google_cal_clt._record("create", event, f"event{i}")
+
+    serial = EventFactory(notion_clt, google_cal_clt).build()
+    # 3 chunks of events on each side, parsed by 2 processes
+    pooled = EventFactory(notion_clt, google_cal_clt, workers=2, chunk_size=10).build()
+
+    assert len(serial[0].events) == len(serial[1].events) == 25
+    assert [_as_dicts(table) for table in pooled] == [
+        _as_dicts(table) for table in serial
+    ]
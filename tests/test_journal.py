@@ -0,0 +1,65 @@
+import pytest
+
+from notion_x_google_calendar.journal import Journal
+
+
+@pytest.fixture(params=["memory", "file"])
+def journal(request, tmp_path) -> Journal:
+    if request.param == "memory":
+        return Journal(path=None)
+    return Journal(path=str(tmp_path / "sync_journal.jsonl"))
+
+
+def test_pending_and_completed(journal):
+    journal.intent("create_gcal", "a", event={})
+    journal.intent("update_notion", "b", event={})
+    journal.done("create_gcal", "a", gcal_id="ga")
+
+    assert [(r["operation"], r["key"]) for r in journal.pending()] == [
+        ("update_notion", "b")
+    ]
+    assert journal.completed() == [
+        {"operation": "create_gcal", "key": "a", "status": "done", "gcal_id": "ga"}
+    ]
+
+
+def test_pending_counts_attempts(journal):
+    journal.intent("update_notion", "b", event={"name": "first"})
+    journal.intent("update_notion", "b", event={"name": "second"})
+
+    (record,) = journal.pending()
+    assert record["attempts"] == 2
+    # The last intent is the one to send again
+    assert record["event"] == {"name": "second"}
+
+
+def test_compact_keeps_unfinished_operations(journal):
+    journal.intent("create_gcal", "a", event={})
+    journal.done("create_gcal", "a", gcal_id="ga")
+    journal.intent("update_notion", "b", event={})
+
+    journal.compact()
+
+    assert journal.completed() == []
+    assert [(r["operation"], r["key"]) for r in journal.pending()] == [
+        ("update_notion", "b")
+    ]
+
+
+def test_compact_gives_up_after_max_attempts(journal):
+    for _ in range(3):
+        journal.intent("update_notion", "b", event={})
+
+    journal.compact(max_attempts=3)
+
+    assert journal.records() == []
+
+
+def test_truncated_record_is_skipped(tmp_path):
+    path = tmp_path / "sync_journal.jsonl"
+    journal = Journal(path=str(path))
+    journal.intent("update_notion", "b", event={})
+    with open(path, "a") as journal_file:
+        journal_file.write('{"operation": "create_gc')
+
+    assert len(journal.pending()) == 1
@@ -0,0 +1,57 @@
+import pytest
+
+from notion_x_google_calendar.profiling import SamplingProfiler
+
+SYNC = ("notion_x_google_calendar.synchronizer", "bi_directionnal_sync")
+
+
+@pytest.mark.parametrize(
+    "stack, stage",
+    [
+        ((("__main__", "<module>"),), "other"),
+        ((SYNC,), "Synchronizer decisions"),
+        (
+            (SYNC, ("notion_x_google_calendar.factory", "build"), ("ssl", "recv")),
+            "network wait",
+        ),
+        (
+            (
+                SYNC,
+                ("notion_x_google_calendar.factory", "_parse_notion_chunk"),
+                ("notion_x_google_calendar.factory", "parse_notion_event"),
+            ),
+            "EventFactory parsing",
+        ),
+        # The innermost recognized frame gives the stage
+        (
+            (
+                SYNC,
+                ("notion_x_google_calendar.snapshot", "load_snapshot"),
+                ("json", "load"),
+                ("json", "loads"),
+                ("json.decoder", "raw_decode"),
+            ),
+            "JSON decoding",
+        ),
+        (
+            (
+                SYNC,
+                ("notion_x_google_calendar.snapshot", "load_snapshot"),
+                ("notion_x_google_calendar.snapshot", "_from_columns"),
+                ("notion_x_google_calendar.models", "event_from_dict"),
+            ),
+            "EventFactory parsing",
+        ),
+        # Encoding the request bodies is not decoding
+        (
+            (SYNC, ("json", "dumps"), ("json.encoder", "encode")),
+            "Synchronizer decisions",
+        ),
+        (
+            (SYNC, ("notion_x_google_calendar.models", "build_hash_table")),
+            "EventHashTable building",
+        ),
+    ],
+)
+def test_stage(stack, stage):
+    assert SamplingProfiler._stage(stack) == stage
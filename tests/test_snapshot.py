@@ -0,0 +1,76 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from notion_x_google_calendar.models import event_to_dict
+from notion_x_google_calendar.replay import replay_snapshot
+from notion_x_google_calendar.snapshot import load_snapshot, save_snapshot
+from .fakes import make_event
+
+LAST_UPDATED = "2030-01-01T00:00:00.000Z"
+
+
+@pytest.fixture
+def events() -> tuple:
+    notion_events = [
+        make_event(
+            "Meeting",
+            notion_id="00000000-0000-0000-0000-000000000001",
+            description="Agenda",
+            attendees={"a@example.com", "b@example.com"},
+            last_updated=LAST_UPDATED,
+        ),
+        make_event(
+            "Call",
+            notion_id="00000000-0000-0000-0000-000000000002",
+            is_video_conference=True,
+            last_updated=LAST_UPDATED,
+        ),
+    ]
+    gcal_events = [
+        make_event(
+            "Lunch", gcal_id="lunch", location="Café", last_updated=LAST_UPDATED
+        )
+    ]
+    return notion_events, gcal_events
+
+
+def test_snapshot_round_trip(tmp_path, events):
+    notion_events, gcal_events = events
+    path = str(tmp_path / "snapshot.json.gz")
+
+    save_snapshot(path, notion_events, gcal_events)
+    notion_event_hashtable, gcal_event_hashtable = load_snapshot(path)
+
+    assert [event_to_dict(event) for event in notion_event_hashtable.events] == [
+        event_to_dict(event) for event in notion_events
+    ]
+    assert [event_to_dict(event) for event in gcal_event_hashtable.events] == [
+        event_to_dict(event) for event in gcal_events
+    ]
+    assert notion_event_hashtable.get_event("Call", notion_events[1].date.start)
+
+
+def test_unsupported_snapshot_version(tmp_path):
+    path = str(tmp_path / "snapshot.json.gz")
+    with gzip.open(path, "wt", encoding="utf-8") as snapshot_file:
+        json.dump({"version": 0, "notion": {}, "gcal": {}}, snapshot_file)
+
+    with pytest.raises(ValueError, match="Unsupported snapshot version"):
+        load_snapshot(path)
+
+
+def test_replay_snapshot(tmp_path, monkeypatch, events):
+    monkeypatch.chdir(tmp_path)
+    save_snapshot("snapshot.json.gz", *events)
+
+    notion_clt, google_cal_clt = replay_snapshot("snapshot.json.gz")
+
+    # Each event only on one side is created on the other one
+    assert google_cal_clt.writes == {"create": 2}
+    # The conference link of the new Google Calendar event is sent back to Notion
+    assert notion_clt.writes == {"create": 1, "update": 1}
+    # Neither the state nor the journal is written
+    assert os.listdir(tmp_path) == ["snapshot.json.gz"]
@@ -0,0 +1,216 @@
+import datetime
+
+import pytest
+
+from notion_x_google_calendar.factory import parse_gcal_event, parse_notion_event
+from notion_x_google_calendar.models import event_to_dict
+from notion_x_google_calendar.state import TOMBSTONE_TTL
+from .fakes import make_event
+
+
+@pytest.fixture
+def pair(synchronizer, notion_clt, google_cal_clt):
+    """Ids of an event created in Notion and synchronized to Google Calendar."""
+    notion_id = notion_clt.create_event(make_event())["id"]
+    synchronizer.bi_directionnal_sync()
+    notion_clt.writes.clear()
+    google_cal_clt.writes.clear()
+    return notion_id, synchronizer.state.get_gcal_id(notion_id)
+
+
+def test_edits_on_both_sides_are_merged(
+    synchronizer, notion_clt, google_cal_clt, pair
+):
+    notion_id, gcal_id = pair
+    notion_clt.edit(notion_id, name="Renamed")
+    google_cal_clt.edit(gcal_id, location="Office")
+
+    synchronizer.bi_directionnal_sync()
+
+    notion_event = parse_notion_event(notion_clt.pages[notion_id])
+    gcal_event = parse_gcal_event(google_cal_clt.events[gcal_id])
+    assert (notion_event.name, notion_event.location) == ("Renamed", "Office")
+    assert (gcal_event.name, gcal_event.location) == ("Renamed", "Office")
+
+    # Our own writes are not synchronized back
+    synchronizer.bi_directionnal_sync()
+    assert notion_clt.writes["update"] == 1
+    assert google_cal_clt.writes["update"] == 1
+
+
+def test_conflict_is_kept_until_both_sides_agree(
+    synchronizer, notion_clt, google_cal_clt, state, pair
+):
+    notion_id, gcal_id = pair
+    notion_clt.edit(notion_id, description="From Notion")
+    google_cal_clt.edit(gcal_id, description="From Google")
+    conflict = {"description": {"notion": "From Notion", "gcal": "From Google"}}
+
+    synchronizer.bi_directionnal_sync()
+    assert state.conflicts == {notion_id: conflict}
+
+    # Still there on the next cycle, and neither side is overwritten
+    synchronizer.bi_directionnal_sync()
+    assert state.conflicts == {notion_id: conflict}
+    assert notion_clt.writes["update"] == google_cal_clt.writes["update"] == 0
+
+    google_cal_clt.edit(gcal_id, description="From Notion")
+    synchronizer.bi_directionnal_sync()
+    assert state.conflicts == {}
+
+
+def test_cancelled_event_is_not_created_again(
+    synchronizer, notion_clt, google_cal_clt, state, pair, caplog
+):
+    notion_id, gcal_id = pair
+    google_cal_clt.cancel(gcal_id)
+
+    synchronizer.bi_directionnal_sync()
+    assert notion_clt.pages[notion_id]["archived"]
+    assert state.get_link(notion_id) is None
+
+    # The page is restored, but its event stays deleted
+    notion_clt.pages[notion_id]["archived"] = False
+    synchronizer.bi_directionnal_sync()
+    assert google_cal_clt.writes["create"] == 0
+    assert "Skipping the event Meeting" in caplog.text
+
+    # Nor once the tombstones are older than their TTL, the page is still listed
+    expired = (
+        datetime.datetime.now(tz=datetime.timezone.utc)
+        - TOMBSTONE_TTL
+        - datetime.timedelta(days=1)
+    ).isoformat()
+    state.tombstones["notion"][notion_id] = expired
+    state.tombstones["gcal"][gcal_id] = expired
+    synchronizer.bi_directionnal_sync()
+    assert google_cal_clt.writes["create"] == 0
+    assert state.is_tombstoned("notion", notion_id)
+    # The event is not listed anymore, its tombstone is dropped
+    assert not state.is_tombstoned("gcal", gcal_id)
+
+
+def test_archived_page_is_not_created_again(
+    synchronizer, notion_clt, google_cal_clt, state, pair
+):
+    notion_id, gcal_id = pair
+    notion_clt.pages[notion_id]["archived"] = True
+
+    synchronizer.bi_directionnal_sync()
+    assert google_cal_clt.events[gcal_id]["status"] == "cancelled"
+    assert state.get_link(notion_id) is None
+
+    # The event is restored, but its page stays archived
+    google_cal_clt.events[gcal_id]["status"] = "confirmed"
+    synchronizer.bi_directionnal_sync()
+    assert notion_clt.writes["create"] == 0
+
+
+def test_resume_replays_pending_operations(
+    synchronizer, notion_clt, google_cal_clt, journal, state
+):
+    notion_event = parse_notion_event(notion_clt.create_event(make_event()))
+    # The process died before Google Calendar answered
+    journal.intent(
+        "create_gcal", notion_event.notion_id, event=event_to_dict(notion_event)
+    )
+    assert len(journal.pending()) == 1
+
+    synchronizer.bi_directionnal_sync()
+
+    assert google_cal_clt.writes["create"] == 1
+    assert state.get_gcal_id(notion_event.notion_id) is not None
+    assert journal.pending() == journal.completed() == []
+
+
+def test_resume_applies_completed_deletions(
+    synchronizer, notion_clt, google_cal_clt, journal, state, pair
+):
+    notion_id, gcal_id = pair
+    notion_clt.pages[notion_id]["archived"] = True
+    # The process died after the deletion, before the state was saved
+    journal.intent("delete_gcal", gcal_id, notion_id=notion_id)
+    google_cal_clt.delete_event(gcal_id)
+    journal.done("delete_gcal", gcal_id, notion_id=notion_id)
+
+    synchronizer.resume()
+
+    assert state.get_link(notion_id) is None
+    assert state.is_tombstoned("notion", notion_id)
+    assert state.is_tombstoned("gcal", gcal_id)
+
+
+def test_unfinished_update_keeps_later_edits(
+    synchronizer, notion_clt, google_cal_clt, journal, pair, monkeypatch
+):
+    notion_id, gcal_id = pair
+    google_cal_clt.edit(gcal_id, location="Office")
+    monkeypatch.setattr(notion_clt, "update_event", lambda notion_event_updated: None)
+    synchronizer.bi_directionnal_sync()
+    monkeypatch.undo()
+    assert [record["operation"] for record in journal.pending()] == ["update_notion"]
+
+    # Edited in Notion before the update is sent again
+    notion_clt.edit(notion_id, name="Renamed")
+    synchronizer.bi_directionnal_sync()
+
+    notion_event = parse_notion_event(notion_clt.pages[notion_id])
+    gcal_event = parse_gcal_event(google_cal_clt.events[gcal_id])
+    assert (notion_event.name, notion_event.location) == ("Renamed", "Office")
+    assert (gcal_event.name, gcal_event.location) == ("Renamed", "Office")
+    assert journal.pending() == []
+
+
+def test_resume_finds_the_page_created_before_a_crash(
+    synchronizer, notion_clt, google_cal_clt, journal, state
+):
+    google_cal_clt._record("create", make_event(), "event")
+    gcal_event = parse_gcal_event(google_cal_clt.events["event"])
+    # The process died after Notion created the page, before it answered
+    journal.intent("create_notion", "event", event=event_to_dict(gcal_event))
+    notion_id = notion_clt.create_event(gcal_event)["id"]
+
+    synchronizer.bi_directionnal_sync()
+    synchronizer.bi_directionnal_sync()
+
+    assert notion_clt.writes["create"] == 1
+    assert state.get_gcal_id(notion_id) == "event"
+    assert "notion_fields" in state.get_link(notion_id)
+    assert journal.records() == []
+
+
+def test_page_of_a_deleted_event_is_not_linked(
+    synchronizer, notion_clt, google_cal_clt, state
+):
+    notion_id = notion_clt.create_event(make_event())["id"]
+    gcal_id = notion_id.replace("-", "")
+    # The event was created then deleted, and the page is not linked anymore
+    google_cal_clt._record("create", make_event(), gcal_id)
+    google_cal_clt.events[gcal_id]["status"] = "cancelled"
+
+    synchronizer.bi_directionnal_sync()
+
+    assert state.get_link(notion_id) is None
+    assert state.is_tombstoned("notion", notion_id)
+    assert state.is_tombstoned("gcal", gcal_id)
+
+
+def test_failed_notion_update_is_sent_again(
+    synchronizer, notion_clt, google_cal_clt, state, pair, monkeypatch
+):
+    notion_id, gcal_id = pair
+    notion_clt.edit(notion_id, name="Renamed")
+    google_cal_clt.edit(gcal_id, location="Office")
+
+    monkeypatch.setattr(notion_clt, "update_event", lambda notion_event_updated: None)
+    synchronizer.bi_directionnal_sync()
+    # The Google Calendar write is recorded even though Notion was not updated
+    assert state.get_link(notion_id)["gcal_fields"]["name"] == "Renamed"
+
+    monkeypatch.undo()
+    synchronizer.bi_directionnal_sync()
+
+    assert parse_notion_event(notion_clt.pages[notion_id]).location == "Office"
+    # The name written to Google Calendar is neither echoed nor seen as a conflict
+    assert google_cal_clt.writes["update"] == 1
+    assert state.conflicts == {}
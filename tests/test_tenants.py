@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+
+import pytest
+
+from notion_module import utils
+from notion_x_google_calendar import tenants
+from notion_x_google_calendar.tenants import (
+    MAX_BACKOFF,
+    Tenant,
+    TenantPool,
+    load_tenants,
+)
+
+
+class FakeSynchronizer:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.cycles = 0
+
+    def bi_directionnal_sync(self) -> None:
+        self.cycles += 1
+        if self.fail:
+            raise RuntimeError("Notion is down")
+
+
+def make_tenant(name: str = "alice", interval: float = 300) -> Tenant:
+    return Tenant(
+        name=name,
+        notion_api_key="secret",
+        notion_calendar_db_id="db",
+        directory=name,
+        interval=interval,
+    )
+
+
+def test_load_tenants_resolves_directories(tmp_path):
+    config_path = tmp_path / "config" / "tenants.json"
+    config_path.parent.mkdir()
+    config_path.write_text(
+        json.dumps(
+            [
+                {
+                    "name": "alice",
+                    "notion_api_key": "a",
+                    "notion_calendar_db_id": "1",
+                    "directory": "alice",
+                },
+                {
+                    "name": "bob",
+                    "notion_api_key": "b",
+                    "notion_calendar_db_id": "2",
+                    "directory": str(tmp_path / "bob"),
+                    "interval": 60,
+                },
+            ]
+        )
+    )
+
+    alice, bob = load_tenants(str(config_path))
+
+    # Relative to the directory of the file, absolute ones are kept
+    assert alice.directory == os.path.join(str(config_path.parent), "alice")
+    assert bob.directory == str(tmp_path / "bob")
+    assert bob.interval == 60
+
+
+def test_rate_limiter_spaces_out_requests(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(utils.time, "monotonic", lambda: 100.0)
+    monkeypatch.setattr(utils.time, "sleep", sleeps.append)
+    rate_limiter = utils.RateLimiter(requests_per_second=2)
+
+    for _ in range(3):
+        rate_limiter.wait()
+
+    assert sleeps == [0.5, 1.0]
+
+
+def test_failing_tenant_is_retried_with_backoff(monkeypatch):
+    tenant = make_tenant(interval=300)
+    tenant.synchronizer = FakeSynchronizer(fail=True)
+    monkeypatch.setattr(tenants.time, "monotonic", lambda: 0.0)
+    tenant_pool = TenantPool([tenant])
+
+    tenant_pool._run_tenant(tenant)
+    assert (tenant.failures, tenant.next_run) == (1, 600)
+    # The clients are built again for the next attempt
+    assert tenant.synchronizer is None
+
+    for _ in range(5):
+        tenant.synchronizer = FakeSynchronizer(fail=True)
+        tenant_pool._run_tenant(tenant)
+    assert (tenant.failures, tenant.next_run) == (6, MAX_BACKOFF)
+
+    tenant.synchronizer = FakeSynchronizer()
+    tenant_pool._run_tenant(tenant)
+    assert (tenant.failures, tenant.next_run) == (0, 300)
+
+
+class StopPolling(Exception):
+    pass
+
+
+def test_tenant_cycles_never_overlap(monkeypatch):
+    # Due on every poll, but its first cycle lasts until the fifth one
+    tenant = make_tenant(interval=0)
+    other_tenant = make_tenant("bob", interval=0)
+    release = threading.Event()
+    cycles = []
+
+    class SlowSynchronizer:
+        def bi_directionnal_sync(self) -> None:
+            cycles.append(tenant.name)
+            release.wait(timeout=5)
+
+    tenant.synchronizer = SlowSynchronizer()
+    other_tenant.synchronizer = FakeSynchronizer()
+    polls = []
+
+    def poll(poll_interval: float) -> None:
+        polls.append(poll_interval)
+        if len(polls) == 5:
+            release.set()
+            raise StopPolling()
+        # Let the other tenant run its cycles meanwhile, time.sleep is patched
+        threading.Event().wait(0.01)
+
+    tenant_pool = TenantPool([tenant, other_tenant], workers=2)
+    monkeypatch.setattr(tenants.time, "sleep", poll)
+    with pytest.raises(StopPolling):
+        tenant_pool.run_forever()
+
+    assert cycles == ["alice"]
+    # The slow tenant does not hold back the other one
+    assert other_tenant.synchronizer.cycles > 1